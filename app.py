@@ -1,8 +1,21 @@
+import os
 import streamlit as st
 import hashlib
 from password_config import ADMIN_PASSWORD_HASH
 from dashboard import homepage_of_cyclone
 from login_page import display_login_page
+from model_registry import registry, SUMMARIZATION_MODEL, SUMMARIZATION_BACKEND
+from translation_service import TRANSLATION_BACKEND
+from local_translation import LOCAL_TRANSLATION_MODEL, LOCAL_TRANSLATION_BACKEND
+from lazy_imports import preload
+from tracing import start_metrics_server
+
+# "background" loads heavy libraries and the summarization model after the first page
+# has rendered, "eager" loads them before rendering, "off" leaves them to first use
+PRELOAD_MODE = os.environ.get("SUMMARIZER_PRELOAD", "background")
+
+# Prometheus metrics on SUMMARIZER_METRICS_PORT, if set; started once per process
+start_metrics_server()
 
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
@@ -15,13 +28,28 @@ def verify_password(password):
     return password_hash == ADMIN_PASSWORD_HASH
 
 
+def start_preload():
+    """Load heavy libraries and the models ahead of the first summary and translation."""
+    if PRELOAD_MODE == "off":
+        return
+    models = [("summarization", SUMMARIZATION_MODEL, SUMMARIZATION_BACKEND)]
+    if TRANSLATION_BACKEND == "local":
+        models.append(("translation", LOCAL_TRANSLATION_MODEL, LOCAL_TRANSLATION_BACKEND))
+    preload(background=PRELOAD_MODE != "eager", on_done=lambda: registry.warm_up(models, background=False))
+
+
 # Main entry point
 def run_application():
+    if PRELOAD_MODE == "eager":
+        start_preload()
     # First check if user is logged in
     if st.session_state.logged_in:
         homepage_of_cyclone()
     else:
         display_login_page()
+    # Only the first run in this process starts the background preload
+    if PRELOAD_MODE == "background":
+        start_preload()
 
 if __name__ == "__main__":
     run_application()
\ No newline at end of file
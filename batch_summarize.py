@@ -0,0 +1,162 @@
+"""
+Summarize every txt/pdf/docx file in a directory (or listed in a manifest) without a browser.
+
+    python batch_summarize.py reports/ --output summaries.jsonl --method extractive --workers 8
+
+Results are appended to the output JSONL as each file finishes, so an interrupted run
+can be restarted with the same command and only the remaining files are processed.
+
+Extractive runs use one worker per core. Abstractive runs default to ABSTRACTIVE_WORKERS,
+since every worker loads its own copy of the model, and the cores are split between the
+workers' PyTorch thread pools instead of each worker starting one thread per core.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from file_handlers import read_path, SUPPORTED_EXTENSIONS
+from summarization_methods import summarize
+from inference_backends import configure_torch_threads
+
+# Worker processes for abstractive runs; each holds a full model in memory
+ABSTRACTIVE_WORKERS = 2
+
+
+def find_files(source):
+    """List input files from a directory (recursively) or a manifest with one path per line."""
+    if os.path.isdir(source):
+        paths = []
+        for root, _, names in os.walk(source):
+            for name in names:
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line if os.path.isabs(line) else os.path.join(base, line)
+            for line in lines if line and not line.startswith("#")]
+
+
+def completed_paths(output_path):
+    """Paths summarized successfully in a previous run; failed files are retried."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    # A record cut off by an interruption may end inside a multi-byte character
+    with open(output_path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut off by an interruption; that file is processed again
+                continue
+            if "error" not in record:
+                done.add(record["path"])
+    return done
+
+
+def default_workers(method):
+    return ABSTRACTIVE_WORKERS if method == "abstractive" else os.cpu_count() or 1
+
+
+def init_abstractive_worker(threads):
+    """Worker initializer: give this worker's PyTorch its share of the cores before the model loads."""
+    try:
+        configure_torch_threads(threads)
+    except ImportError:
+        # Reported per file when the model fails to load, rather than breaking the whole pool
+        pass
+
+
+def process_file(path, method, top_n):
+    """Worker: extract and summarize one file, returning a JSON-serialisable record."""
+    start = time.perf_counter()
+    record = {"path": path, "method": method, "top_n": top_n}
+    try:
+        # PDF pages are extracted in this process; the batch pool already uses every core
+        text = read_path(path, pdf_workers=1)
+        record["input_chars"] = len(text)
+        record["summary"] = summarize(text, method, top_n)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def run_batch(paths, output_path, method="extractive", top_n=2, workers=None, log=sys.stderr):
+    """
+    Summarize paths across a process pool, streaming results to output_path. Returns a stats dict.
+    workers defaults to default_workers(method).
+    """
+    done = completed_paths(output_path)
+    pending = [path for path in paths if path not in done]
+    print(f"{len(paths)} files, {len(done & set(paths))} already done, {len(pending)} to process", file=log)
+
+    if workers is None:
+        workers = default_workers(method)
+    pool_options = {}
+    if method == "abstractive":
+        pool_options = {"initializer": init_abstractive_worker,
+                        "initargs": (max(1, (os.cpu_count() or 1) // workers),)}
+
+    start = time.perf_counter()
+    succeeded = failed = 0
+    with open(output_path, "a+", encoding="utf-8", errors="replace") as out, \
+            ProcessPoolExecutor(max_workers=workers, **pool_options) as executor:
+        # Terminate a record cut off by an interruption so the next one starts on its own line
+        if out.tell() > 0:
+            out.seek(out.tell() - 1)
+            if out.read(1) != "\n":
+                out.write("\n")
+        futures = [executor.submit(process_file, path, method, top_n) for path in pending]
+        for future in as_completed(futures):
+            record = future.result()
+            # ASCII only, so a record cut off mid-write never leaves half a character behind
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            if "error" in record:
+                failed += 1
+                print(f"failed: {record['path']}: {record['error']}", file=log)
+            else:
+                succeeded += 1
+            finished = succeeded + failed
+            if finished % 100 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"{finished}/{len(pending)} files, {finished / elapsed:.2f} docs/s", file=log)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "processed": succeeded + failed,
+        "succeeded": succeeded,
+        "failed": failed,
+        "skipped": len(paths) - len(pending),
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round((succeeded + failed) / elapsed, 3) if elapsed > 0 else 0.0,
+    }
+    print(f"Done: {stats['processed']} files in {stats['seconds']}s ({stats['docs_per_second']} docs/s), "
+          f"{failed} failed", file=log)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch summarize txt/pdf/docx files.")
+    parser.add_argument("source", help="Directory to walk, or a manifest file with one path per line")
+    parser.add_argument("-o", "--output", default="summaries.jsonl", help="JSONL file to append results to")
+    parser.add_argument("-m", "--method", choices=["extractive", "abstractive"], default="extractive")
+    parser.add_argument("-n", "--top-n", type=int, default=2, help="Number of key sentences (extractive only)")
+    parser.add_argument("-w", "--workers", type=int,
+                        help=f"Worker processes (default: one per core, {ABSTRACTIVE_WORKERS} for abstractive)")
+    args = parser.parse_args(argv)
+
+    paths = find_files(args.source)
+    stats = run_batch(paths, args.output, args.method, args.top_n, args.workers)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
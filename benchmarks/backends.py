@@ -0,0 +1,190 @@
+"""
+Compare abstractive inference backends on CPU: latency, memory and ROUGE drift.
+
+    python -m benchmarks.backends                                  # all configurations, synthetic texts
+    python -m benchmarks.backends --texts articles/ --threads 4    # .txt files from a directory
+    python -m benchmarks.backends --configs bart:pytorch distilled:quantized --max-rouge-drop 0.05
+
+A configuration is model:backend, where model is an alias from model_registry.MODEL_ALIASES
+or a checkpoint name and backend is one of inference_backends.BACKENDS. The first configuration
+is the reference: ROUGE is computed between its summaries and every other configuration's,
+so drift measures how far an optimized backend moves away from the current model's output.
+
+Each configuration runs in a fresh interpreter so its resident memory is measured in isolation.
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from benchmarks.corpus import make_text
+from inference_backends import onnx_support
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_CONFIGS = ("bart:pytorch", "bart:quantized", "bart:onnx",
+                   "distilled:pytorch", "distilled:quantized", "distilled:onnx")
+SYNTHETIC_TEXTS = 8
+SYNTHETIC_TEXT_BYTES = 3000
+
+WORKER_SCRIPT = """
+import sys, json, time, resource
+from model_registry import MODEL_ALIASES, get_pipeline
+from summarization_methods import abstractive_summary
+model, backend, max_length, min_length = sys.argv[1:5]
+texts = json.load(sys.stdin)
+model = MODEL_ALIASES.get(model, model)
+start = time.perf_counter()
+pipe = get_pipeline("summarization", model, backend)
+load_seconds = time.perf_counter() - start
+# The first call pays for one-off allocations and graph optimizations
+abstractive_summary(texts[0], int(max_length), int(min_length), model_name=model, backend=backend)
+seconds, summaries = [], []
+for text in texts:
+    start = time.perf_counter()
+    summaries.append(abstractive_summary(text, int(max_length), int(min_length), model_name=model, backend=backend))
+    seconds.append(time.perf_counter() - start)
+from model_registry import registry
+print(json.dumps({
+    "load_seconds": load_seconds,
+    "seconds": seconds,
+    "summaries": summaries,
+    "model_bytes": registry.memory_in_use(),
+    "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+}))
+"""
+
+
+def _tokens(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def _ngrams(tokens, n):
+    counts = {}
+    for i in range(len(tokens) - n + 1):
+        gram = tuple(tokens[i:i + n])
+        counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def _f1(overlap, candidate_total, reference_total):
+    if not overlap:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge_n(candidate, reference, n):
+    candidate_grams = _ngrams(_tokens(candidate), n)
+    reference_grams = _ngrams(_tokens(reference), n)
+    overlap = sum(min(count, reference_grams.get(gram, 0)) for gram, count in candidate_grams.items())
+    return _f1(overlap, sum(candidate_grams.values()), sum(reference_grams.values()))
+
+
+def rouge_l(candidate, reference):
+    """F1 of the longest common subsequence of tokens."""
+    a, b = _tokens(candidate), _tokens(reference)
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    return _f1(previous[-1], len(a), len(b))
+
+
+def rouge(candidates, references):
+    """Mean ROUGE-1/2/L F1 over paired summaries."""
+    pairs = list(zip(candidates, references))
+    return {
+        "rouge1": statistics.mean(rouge_n(c, r, 1) for c, r in pairs),
+        "rouge2": statistics.mean(rouge_n(c, r, 2) for c, r in pairs),
+        "rougeL": statistics.mean(rouge_l(c, r) for c, r in pairs),
+    }
+
+
+def load_texts(directory):
+    if directory is None:
+        return [make_text(SYNTHETIC_TEXT_BYTES, seed=seed) for seed in range(SYNTHETIC_TEXTS)]
+    texts = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name), "r", encoding="utf-8", errors="replace") as f:
+                texts.append(f.read())
+    if not texts:
+        raise SystemExit(f"No .txt files in {directory}")
+    return texts
+
+
+def run_config(config, texts, threads, max_length, min_length):
+    model, _, backend = config.partition(":")
+    if backend == "onnx" and not onnx_support:
+        # Never time another backend under the onnx label
+        return {"config": config, "error": "optimum[onnxruntime] is not installed"}
+    env = dict(os.environ, SUMMARIZER_INFERENCE_THREADS=str(threads))
+    result = subprocess.run([sys.executable, "-c", WORKER_SCRIPT, model, backend or "pytorch",
+                             str(max_length), str(min_length)],
+                            cwd=ROOT, env=env, input=json.dumps(texts), capture_output=True, text=True)
+    if result.returncode != 0:
+        # Usually a missing optional dependency or a model that cannot be downloaded
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+        return {"config": config, "error": error}
+    return {"config": config, **json.loads(result.stdout.strip().splitlines()[-1])}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CPU backends for abstractive summarization.")
+    parser.add_argument("--configs", nargs="+", default=list(DEFAULT_CONFIGS),
+                        help="model:backend pairs; the first is the reference")
+    parser.add_argument("--texts", help="Directory of .txt files to summarize (default: synthetic texts)")
+    parser.add_argument("--threads", type=int, default=0, help="Inference threads (0 = library default)")
+    parser.add_argument("--max-length", type=int, default=150)
+    parser.add_argument("--min-length", type=int, default=50)
+    parser.add_argument("--max-rouge-drop", type=float,
+                        help="Fail if any configuration's ROUGE-L against the reference is below 1 - this")
+    parser.add_argument("--output", help="Also write the full results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    texts = load_texts(args.texts)
+    results = []
+    for config in args.configs:
+        print(f"running {config} on {len(texts)} texts...", file=sys.stderr)
+        results.append(run_config(config, texts, args.threads, args.max_length, args.min_length))
+
+    reference = results[0]
+    if "error" in reference:
+        print(f"Reference configuration {reference['config']} failed: {reference['error']}", file=sys.stderr)
+        return 1
+
+    failed = False
+    print(f"{'config':28s} {'load s':>8s} {'median s':>9s} {'speedup':>8s} {'model MB':>9s} {'RSS MB':>8s} "
+          f"{'R-1':>6s} {'R-2':>6s} {'R-L':>6s}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['config']:28s} skipped: {result['error']}")
+            continue
+        result["median_seconds"] = statistics.median(result["seconds"])
+        result["speedup"] = statistics.median(reference["seconds"]) / result["median_seconds"]
+        result["rouge"] = rouge(result["summaries"], reference["summaries"])
+        print(f"{result['config']:28s} {result['load_seconds']:8.2f} {result['median_seconds']:9.3f} "
+              f"{result['speedup']:7.2f}x {result['model_bytes'] / 1e6:9.1f} {result['max_rss_bytes'] / 1e6:8.1f} "
+              f"{result['rouge']['rouge1']:6.3f} {result['rouge']['rouge2']:6.3f} {result['rouge']['rougeL']:6.3f}")
+        if args.max_rouge_drop is not None and result["rouge"]["rougeL"] < 1 - args.max_rouge_drop:
+            print(f"FAIL: {result['config']} ROUGE-L {result['rouge']['rougeL']:.3f} against the reference",
+                  file=sys.stderr)
+            failed = True
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"threads": args.threads, "texts": len(texts), "results": results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
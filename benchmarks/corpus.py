@@ -0,0 +1,195 @@
+"""
+Synthetic txt/pdf/docx corpora for the benchmarks.
+Text is generated from a fixed vocabulary with a seeded RNG so runs are reproducible.
+"""
+import io
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+VOCABULARY = (
+    "cyclone storm wind rain coast damage people city river flood warning power road tree house "
+    "government relief team district report officer water supply hospital school camp evacuation "
+    "forecast pressure system landfall surge fishermen boat harbour crop farmer loss estimate "
+    "survey village bridge network rescue shelter food medicine electricity restoration week"
+).split()
+STOP_WORDS = "the a of to and in on for with was were is are by from at".split()
+
+SIZES = {
+    "1KB": 1024,
+    "10KB": 10 * 1024,
+    "100KB": 100 * 1024,
+    "1MB": 1024 * 1024,
+    "10MB": 10 * 1024 * 1024,
+    "100MB": 100 * 1024 * 1024,
+}
+
+
+def parse_size(label):
+    """Accept the labels in SIZES or a plain byte count."""
+    return SIZES[label] if label in SIZES else int(label)
+
+
+def make_sentence(rng):
+    words = [rng.choice(VOCABULARY if rng.random() < 0.7 else STOP_WORDS) for _ in range(rng.randint(6, 24))]
+    words[0] = words[0].capitalize()
+    # Mix of terminators, plus the odd abbreviation so segmenters see realistic input
+    if rng.random() < 0.05:
+        words.insert(rng.randint(1, len(words) - 1), "Dr.")
+    return " ".join(words) + rng.choice(".....!?")
+
+
+def make_text(size_bytes, seed=0, paragraph_sentences=6):
+    """Generate roughly size_bytes of English-like text split into paragraphs."""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size_bytes:
+        paragraph = " ".join(make_sentence(rng) for _ in range(paragraph_sentences))
+        parts.append(paragraph)
+        total += len(paragraph) + 2
+    return "\n\n".join(parts)
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text, lines_per_page=45, chars_per_line=90):
+    """Minimal multi-page PDF with Helvetica text, readable by PyPDF2, without extra dependencies."""
+    words = text.split()
+    lines = []
+    line = ""
+    for word in words:
+        if len(line) + len(word) + 1 > chars_per_line:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    if line:
+        lines.append(line)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page_lines in pages:
+        content = "BT /F1 10 Tf 12 TL 50 760 Td " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in page_lines) + " ET"
+        content = content.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_number = len(objects)
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                        "/Resources << /Font << /F1 3 0 R >> >> >>" % content_number).encode())
+        kids.append(len(objects))
+    objects[1] = ("<< /Type /Pages /Kids [%s] /Count %d >>"
+                  % (" ".join(f"{k} 0 R" for k in kids), len(kids))).encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _docx_paragraph(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def make_docx(text, table_every=0, table_rows=4, table_cols=3):
+    """
+    Minimal DOCX with one paragraph per text paragraph, written with zipfile only.
+    With table_every > 0 a table is inserted after every table_every paragraphs.
+    """
+    body = []
+    for i, paragraph in enumerate(text.split("\n\n"), start=1):
+        body.append(_docx_paragraph(paragraph))
+        if table_every and i % table_every == 0:
+            words = paragraph.split()
+            rows = []
+            for r in range(table_rows):
+                cells = "".join(
+                    f"<w:tc>{_docx_paragraph(words[(r * table_cols + c) % len(words)])}</w:tc>"
+                    for c in range(table_cols))
+                rows.append(f"<w:tr>{cells}</w:tr>")
+            body.append(f"<w:tbl>{''.join(rows)}</w:tbl>")
+    document = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<w:document xmlns:w="{_W_NS}"><w:body>{"".join(body)}</w:body></w:document>')
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _DOCX_RELS)
+        archive.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+MIME_TYPES = {
+    "txt": "text/plain",
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+class FakeUpload(io.BytesIO):
+    """Mimics the parts of Streamlit's UploadedFile used by file_handlers.read_file."""
+
+    def __init__(self, data, file_type, name="upload"):
+        super().__init__(data)
+        self.type = MIME_TYPES.get(file_type, file_type)
+        self.name = f"{name}.{file_type}"
+        self.size = len(data)
+
+
+def make_file(file_type, text):
+    if file_type == "txt":
+        return text.encode("utf-8")
+    if file_type == "pdf":
+        return make_pdf(text)
+    if file_type == "docx":
+        return make_docx(text)
+    raise ValueError(f"Unknown file type: {file_type}")
+
+
+def write_corpus(directory, sizes=("1KB", "10KB", "100KB"), file_types=("txt", "pdf", "docx"), seed=0):
+    """Write one file per size and type into directory and return the paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for label in sizes:
+        text = make_text(parse_size(label), seed)
+        for file_type in file_types:
+            path = os.path.join(directory, f"synthetic_{label}.{file_type}")
+            with open(path, "wb") as f:
+                f.write(make_file(file_type, text))
+            paths.append(path)
+    return paths
@@ -0,0 +1,73 @@
+"""
+Streaming DOCX extraction against python-docx on large documents with many tables.
+
+    python -m benchmarks.docx
+    python -m benchmarks.docx --sizes 1MB 10MB --table-every 2 --repeat 3
+
+python-docx is timed twice: paragraphs only, as the app read DOCX files before, and
+paragraphs plus table cells, which is closer to what the streaming extractor returns.
+"""
+import io
+import sys
+import argparse
+
+from benchmarks.corpus import make_text, make_docx, parse_size
+from benchmarks.run import measure
+from file_handlers import iter_docx_paragraphs
+
+
+def python_docx_paragraphs(data):
+    import docx
+    document = docx.Document(io.BytesIO(data))
+    return "".join(paragraph.text + "\n" for paragraph in document.paragraphs)
+
+
+def python_docx_with_tables(data):
+    import docx
+    document = docx.Document(io.BytesIO(data))
+    parts = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            parts.extend(cell.text for cell in row.cells)
+    return "\n".join(parts)
+
+
+def streaming(data):
+    return "".join(paragraph + "\n" for paragraph in iter_docx_paragraphs(io.BytesIO(data)))
+
+
+EXTRACTORS = {
+    "streaming": streaming,
+    "python-docx": python_docx_paragraphs,
+    "python-docx+tables": python_docx_with_tables,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare DOCX text extractors.")
+    parser.add_argument("--sizes", nargs="+", default=["100KB", "1MB", "10MB"])
+    parser.add_argument("--table-every", type=int, default=3, help="Insert a table after every N paragraphs")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>6s} {'extractor':20s} {'ms':>10s} {'peak MB':>9s} {'chars':>11s}")
+    for label in args.sizes:
+        data = make_docx(make_text(parse_size(label)), table_every=args.table_every)
+        timings = {}
+        for name, extract in EXTRACTORS.items():
+            try:
+                chars = len(extract(data))
+            except ImportError as e:
+                print(f"skipping {name}: {e}", file=sys.stderr)
+                continue
+            seconds, peak = measure(lambda: extract(data), args.repeat)
+            timings[name] = seconds
+            print(f"{label:>6s} {name:20s} {seconds * 1000:10.2f} {peak / 1e6:9.2f} {chars:11d}")
+        if "streaming" in timings and "python-docx" in timings:
+            print(f"{label:>6s} streaming is {timings['python-docx'] / timings['streaming']:.1f}x faster "
+                  f"than python-docx paragraphs only")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Extractive scoring with a persisted corpus IDF model against fitting IDF per request.
+
+    python -m benchmarks.idf
+    python -m benchmarks.idf --sizes 10KB 1MB --corpus-documents 2000 --repeat 5
+
+A model is built from --corpus-documents synthetic documents, saved and loaded back
+memory-mapped, then both paths score the same documents. Agreement is the fraction of the
+top 5 sentences both paths select.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from benchmarks.corpus import make_text, parse_size
+from benchmarks.run import measure
+from idf_model import IdfModel, FREQUENCY_FILE
+from sentence_scoring import score_sentences
+from text_processing import simple_sentence_tokenize
+
+TOP_N = 5
+
+
+def _top(scores, n=TOP_N):
+    return {index for index, _ in sorted(scores, key=lambda pair: pair[1], reverse=True)[:n]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-request IDF fitting with a loaded IDF model.")
+    parser.add_argument("--sizes", nargs="+", default=["10KB", "100KB", "1MB"])
+    parser.add_argument("--corpus-documents", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    documents = [make_text(20_000, seed=seed) for seed in range(1, args.corpus_documents + 1)]
+    start = time.perf_counter()
+    model = IdfModel.build(documents)
+    build_seconds = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as path:
+        model.save(path)
+        artifact_mb = os.path.getsize(os.path.join(path, FREQUENCY_FILE)) / 1e6
+        start = time.perf_counter()
+        model = IdfModel.load(path)
+        model.idf  # pages the array in
+        load_seconds = time.perf_counter() - start
+        print(f"built from {args.corpus_documents} documents in {build_seconds:.2f}s, "
+              f"{artifact_mb:.1f} MB on disk, loaded in {load_seconds * 1000:.1f} ms")
+
+        print(f"{'size':>6s} {'sentences':>9s} {'fit ms':>10s} {'model ms':>10s} {'speedup':>8s} "
+              f"{'top-{} agree'.format(TOP_N):>12s}")
+        for label in args.sizes:
+            sentences = simple_sentence_tokenize(make_text(parse_size(label)))
+            fit_seconds, _ = measure(lambda: score_sentences(sentences), args.repeat)
+            model_seconds, _ = measure(lambda: score_sentences(sentences, idf_model=model), args.repeat)
+            agreement = len(_top(score_sentences(sentences)) & _top(score_sentences(sentences, idf_model=model)))
+            print(f"{label:>6s} {len(sentences):9d} {fit_seconds * 1000:10.2f} {model_seconds * 1000:10.2f} "
+                  f"{fit_seconds / model_seconds:7.1f}x {agreement / TOP_N:12.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+Load test: many simulated users driving app.py at once, in-process with Streamlit's AppTest.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --concurrency 1 4 16 --sessions 32 --method abstractive \
+        --model-latency-ms 400 --translate-latency-ms 80 --output load.json
+
+Each session opens the app, logs in, uploads a document, summarizes it, waits for the
+result (rerunning the page as the browser would while the progress view polls), then
+translates the summary. The summarization model is a stand-in that sleeps for
+--model-latency-ms per call plus --model-ms-per-token, loaded through the shared model
+registry and queued by the inference scheduler like the real one; translation goes to
+translation_stub with --translate-latency-ms. Every session uploads a different document
+so the summary cache does not answer for the model.
+
+AppTest installs its runtime in a process-wide slot, so page runs from different sessions
+are serialised; the work they hand to background jobs, the model queue and the translation
+endpoint runs concurrently. Clicks therefore do not wait inline for their job: sessions
+poll every --poll-ms instead, as the progress view does in the browser.
+
+For each concurrency level the report gives throughput, latency percentiles per step and
+for whole sessions, and resident memory added per live session. Exits non-zero if any
+session failed.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import make_text, parse_size
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEPS = ("first_paint", "login", "upload", "summarize", "translate")
+STEP_TIMEOUT_SECONDS = 300
+USERNAME = "admin"
+
+# AppTest.run swaps a mock runtime in and out of a process-wide slot; runs must not overlap
+_page_lock = threading.Lock()
+
+
+class StandInTokenizer:
+    model_max_length = 1024
+
+    def __call__(self, texts, add_special_tokens=False):
+        if isinstance(texts, str):
+            return {"input_ids": texts.split()}
+        return {"input_ids": [text.split() for text in texts]}
+
+
+class StandInSummarizer:
+    """Duck-typed summarization pipeline: the first max_length words of each input, after a delay."""
+
+    def __init__(self, latency, seconds_per_token):
+        self.tokenizer = StandInTokenizer()
+        self.latency = latency
+        self.seconds_per_token = seconds_per_token
+
+    def __call__(self, inputs, max_length=150, **kwargs):
+        batch = [inputs] if isinstance(inputs, str) else list(inputs)
+        tokens = sum(len(text.split()) for text in batch)
+        time.sleep(self.latency + self.seconds_per_token * tokens)
+        return [{"summary_text": " ".join(text.split()[:max_length])} for text in batch]
+
+
+def rss_bytes():
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        # Peak rather than current outside Linux; differences are then an upper bound
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _run(target):
+    """Run the page after interacting with target, an AppTest or one of its widgets."""
+    with _page_lock:
+        return target.run()
+
+
+def _button(app, label):
+    return next(button for button in app.button if button.label == label)
+
+
+def _wait_for(app, done, poll_seconds):
+    """Rerun the page until done(app) holds."""
+    deadline = time.perf_counter() + STEP_TIMEOUT_SECONDS
+    while not done(app):
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+        if app.error:
+            raise RuntimeError(app.error[0].value)
+        if time.perf_counter() > deadline:
+            raise TimeoutError("step did not finish")
+        time.sleep(poll_seconds)
+        _run(app)
+
+
+def run_session(number, args, password):
+    """One simulated user. Returns (per-step seconds, the AppTest, error or None)."""
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=STEP_TIMEOUT_SECONDS)
+
+    def step(name, fn):
+        start = time.perf_counter()
+        fn()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+        timings[name] = time.perf_counter() - start
+
+    try:
+        step("first_paint", lambda: _run(app))
+
+        def login():
+            app.text_input[0].input(USERNAME)
+            app.text_input[1].input(password)
+            _run(app.button[0].click())
+        step("login", login)
+
+        data = make_text(parse_size(args.document_size), seed=number + 1).encode("utf-8")
+        app.radio(key="input_source").set_value("File Upload")
+        _run(app)
+        step("upload", lambda: _run(app.file_uploader[0].upload(f"report-{number}.txt", data, "text/plain")))
+
+        poll_seconds = args.poll_ms / 1000
+
+        def summarize():
+            app.radio(key="method").set_value(args.method)
+            _run(_button(app, "Summarize").click())
+            _wait_for(app, lambda app: app.session_state.summary_generated, poll_seconds)
+        step("summarize", summarize)
+
+        def translate():
+            _run(_button(app, "Translate to Tamil").click())
+            _wait_for(app, lambda app: app.session_state.translated_summary, poll_seconds)
+        step("translate", translate)
+    except Exception as e:
+        return timings, app, f"{type(e).__name__}: {e}"
+    return timings, app, None
+
+
+def run_level(concurrency, sessions, args, password, first_session):
+    """Run sessions users with at most concurrency at once, keeping every AppTest alive for the memory reading."""
+    from inference_scheduler import get_scheduler
+
+    apps = []
+    results = []
+    lock = threading.Lock()
+
+    def one(number):
+        timings, app, error = run_session(number, args, password)
+        with lock:
+            apps.append(app)
+            results.append((timings, error))
+
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load-session") as executor:
+        list(executor.map(one, range(first_session, first_session + sessions)))
+    elapsed = time.perf_counter() - start
+    rss_after = rss_bytes()
+
+    completed = [timings for timings, error in results if error is None]
+    errors = [error for _, error in results if error is not None]
+    totals = [sum(timings.values()) for timings in completed]
+    report = {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "completed": len(completed),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "seconds": elapsed,
+        "sessions_per_minute": len(completed) / elapsed * 60 if elapsed else None,
+        "session_seconds": {name: percentile(totals, fraction)
+                            for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        "steps": {},
+        "rss_mb": rss_after / 1e6,
+        "rss_mb_per_session": (rss_after - rss_before) / 1e6 / sessions,
+        # Cumulative over this and earlier levels
+        "scheduler": get_scheduler().stats(),
+    }
+    for name in STEPS:
+        values = [timings[name] for timings in completed if name in timings]
+        report["steps"][name] = {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95),
+                                 "p99": percentile(values, 0.99),
+                                 "mean": statistics.fmean(values) if values else None}
+    del apps
+    return report
+
+
+def print_level(report):
+    session = report["session_seconds"]
+    print(f"{report['concurrency']:>5d} {report['completed']:>4d}/{report['sessions']:<4d} {report['errors']:>6d} "
+          f"{report['sessions_per_minute'] or 0:>10.1f} "
+          f"{session['p50'] or 0:>8.2f} {session['p95'] or 0:>8.2f} {session['p99'] or 0:>8.2f} "
+          f"{report['steps']['summarize']['p95'] or 0:>9.2f} {report['steps']['translate']['p95'] or 0:>9.2f} "
+          f"{report['rss_mb_per_session']:>9.2f} {report['rss_mb']:>8.0f}")
+    for error in report["error_samples"]:
+        print(f"      error: {error}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive many simulated sessions through the Streamlit app.")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--sessions", type=int, help="Sessions per level (default: 2 x concurrency)")
+    parser.add_argument("--method", choices=["extractive", "abstractive"], default="abstractive")
+    parser.add_argument("--document-size", default="10KB")
+    parser.add_argument("--model-latency-ms", type=float, default=200.0, help="Stand-in model delay per call")
+    parser.add_argument("--model-ms-per-token", type=float, default=0.05)
+    parser.add_argument("--translate-latency-ms", type=float, default=50.0)
+    parser.add_argument("--translate-fail-rate", type=float, default=0.0)
+    parser.add_argument("--poll-ms", type=float, default=250.0, help="How often waiting sessions rerun the page")
+    parser.add_argument("--password", default=os.environ.get("SUMMARIZER_LOAD_PASSWORD", "adminpass"))
+    parser.add_argument("--output", help="Also write the full report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    # Read by the app's modules at import time, so set before any of them is imported
+    os.environ["SUMMARIZER_PRELOAD"] = "off"
+    cache_dir = tempfile.TemporaryDirectory(prefix="summarizer-load-")
+    os.environ["SUMMARIZER_CACHE_DIR"] = cache_dir.name
+
+    import dashboard
+    import model_registry
+    import translation_service
+    from translation_stub import running_stub
+
+    summarizer = StandInSummarizer(args.model_latency_ms / 1000, args.model_ms_per_token / 1000)
+    model_registry.registry = model_registry.ModelRegistry(loader=lambda task, model_name, backend: summarizer)
+    # An inline wait would hold the page lock while the job runs; sessions poll instead
+    dashboard.INLINE_WAIT_SECONDS = 0
+
+    levels = []
+    with running_stub(latency=args.translate_latency_ms / 1000, fail_rate=args.translate_fail_rate) as (url, stub):
+        translation_service.TRANSLATE_URL = url
+        print(f"{'conc':>5s} {'done':>9s} {'errors':>6s} {'per min':>10s} {'p50 s':>8s} {'p95 s':>8s} "
+              f"{'p99 s':>8s} {'sum p95':>9s} {'tr p95':>9s} {'MB/sess':>9s} {'RSS MB':>8s}")
+        # One uncounted session pays for imports and first-use caches, which would otherwise
+        # be charged to the first level's latency and memory
+        _, _, error = run_session(-1, args, args.password)
+        if error:
+            print(f"warm-up session failed: {error}", file=sys.stderr)
+            return 1
+        first_session = 0
+        for concurrency in args.concurrency:
+            sessions = args.sessions or 2 * concurrency
+            report = run_level(concurrency, sessions, args, args.password, first_session)
+            first_session += sessions
+            levels.append(report)
+            print_level(report)
+        translate_requests = stub.stats["requests"]
+
+    cache_dir.cleanup()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "levels": levels, "translate_requests": translate_requests},
+                      f, indent=2)
+    return 1 if any(level["errors"] for level in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Benchmarks for every pipeline stage over synthetic corpora of increasing size.
+
+    python -m benchmarks.run                                   # default sizes 1KB..1MB
+    python -m benchmarks.run --sizes 1KB 10MB 100MB --stages tokenize scores
+    python -m benchmarks.run --save-baseline                   # record benchmarks/baseline.json
+    python -m benchmarks.run --tolerance 1.3                   # fail if >30% slower than baseline
+    python -m benchmarks.run --ci                              # also fail if there is no baseline
+
+Each stage is timed (best of --repeat) and its peak Python heap is measured with tracemalloc
+in a separate run. Throughput is input MB/s. The scaling exponent is the log-log slope of time
+against input size (1.0 is linear, 2.0 quadratic).
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import tracemalloc
+
+from benchmarks.corpus import make_text, make_file, parse_size, FakeUpload
+from text_processing import simple_sentence_tokenize, get_sentence_scores, get_summary
+from file_handlers import read_file
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = ("1KB", "10KB", "100KB", "1MB")
+# Slow stages are only run up to this input size
+STAGE_SIZE_LIMITS = {
+    "abstractive": "100KB",
+    "translate": "100KB",
+    "translate_local": "10KB",
+}
+TINY_SUMMARIZATION_MODEL = "sshleifer/distilbart-xsum-1-1"
+# Differences below this many seconds are treated as noise when comparing with the baseline
+NOISE_FLOOR_SECONDS = 0.005
+
+
+def _prepare_tokenize(text):
+    return lambda: simple_sentence_tokenize(text)
+
+
+def _prepare_scores(text):
+    sentences = simple_sentence_tokenize(text)
+    return lambda: get_sentence_scores(sentences)
+
+
+def _prepare_summary(text):
+    sentences = simple_sentence_tokenize(text)
+    scores = get_sentence_scores(sentences)
+    return lambda: get_summary(sentences, scores, 5)
+
+
+def _prepare_read(file_type):
+    def prepare(text):
+        data = make_file(file_type, text)
+        return lambda: read_file(FakeUpload(data, file_type))
+    return prepare
+
+
+def _prepare_ingest(text):
+    from text_ingestion import iter_text_blocks
+    data = make_file("txt", text)
+    # Blocks are consumed without being joined, so peak memory should stay near one block
+    return lambda: sum(len(block) for block in iter_text_blocks(FakeUpload(data, "txt")))
+
+
+def _prepare_abstractive(model_name):
+    def prepare(text):
+        from summarization_methods import abstractive_summary
+        from model_registry import get_pipeline, SUMMARIZATION_BACKEND
+        # Load outside the timed region; the registry keeps it for the timed calls
+        get_pipeline("summarization", model_name, SUMMARIZATION_BACKEND)
+        return lambda: abstractive_summary(text, max_length=40, min_length=5, model_name=model_name)
+    return prepare
+
+
+def _prepare_translate(stub_url):
+    def prepare(text):
+        import translation_service
+        translation_service.TRANSLATE_URL = stub_url
+        return lambda: translation_service.translate_text(text)
+    return prepare
+
+
+def _prepare_translate_local(text):
+    from local_translation import translate_text_local, sentence_cache, LOCAL_TRANSLATION_MODEL, LOCAL_TRANSLATION_BACKEND
+    from model_registry import get_pipeline
+    # Load outside the timed region; the registry keeps it for the timed calls
+    get_pipeline("translation", LOCAL_TRANSLATION_MODEL, LOCAL_TRANSLATION_BACKEND)
+
+    def translate():
+        # Every timed run translates from scratch rather than from the sentence cache
+        sentence_cache.clear()
+        return translate_text_local(text)
+    return translate
+
+
+def measure(fn, repeat):
+    """Best wall time over repeat runs after one warm-up call, then peak traced memory from one more run."""
+    # The warm-up pays for lazy imports and first-call caches outside the timed runs
+    fn()
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def scaling_exponent(points):
+    """Least-squares slope of log(seconds) against log(bytes)."""
+    points = [(math.log(size), math.log(seconds)) for size, seconds in points if seconds > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    denominator = sum((x - mean_x) ** 2 for x, _ in points)
+    if denominator == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / denominator
+
+
+def run(stages, sizes, repeat, abstractive_model):
+    from translation_stub import running_stub
+
+    results = []
+    with running_stub() as (stub_url, _):
+        preparers = {
+            "tokenize": _prepare_tokenize,
+            "scores": _prepare_scores,
+            "summary": _prepare_summary,
+            "ingest_txt": _prepare_ingest,
+            "read_txt": _prepare_read("txt"),
+            "read_pdf": _prepare_read("pdf"),
+            "read_docx": _prepare_read("docx"),
+            "abstractive": _prepare_abstractive(abstractive_model),
+            "translate": _prepare_translate(stub_url),
+            "translate_local": _prepare_translate_local,
+        }
+        for label in sizes:
+            size = parse_size(label)
+            text = make_text(size)
+            for stage in stages:
+                limit = STAGE_SIZE_LIMITS.get(stage)
+                if limit and size > parse_size(limit):
+                    continue
+                try:
+                    fn = preparers[stage](text)
+                except (ImportError, OSError) as e:
+                    # Missing optional dependency, or the model cannot be downloaded
+                    print(f"skipping {stage}: {e}", file=sys.stderr)
+                    continue
+                seconds, peak = measure(fn, repeat)
+                result = {
+                    "stage": stage,
+                    "size": label,
+                    "bytes": len(text),
+                    "seconds": seconds,
+                    "mb_per_second": len(text) / 1e6 / seconds if seconds else None,
+                    "peak_bytes": peak,
+                }
+                results.append(result)
+                print(f"{stage:12s} {label:>6s}  {seconds * 1000:10.2f} ms  "
+                      f"{result['mb_per_second'] or 0:8.2f} MB/s  peak {peak / 1e6:8.2f} MB", file=sys.stderr)
+    return results
+
+
+def scaling_report(results):
+    by_stage = {}
+    for result in results:
+        by_stage.setdefault(result["stage"], []).append((result["bytes"], result["seconds"]))
+    return {stage: scaling_exponent(points) for stage, points in by_stage.items()}
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Return a list of human-readable regressions."""
+    previous = {(r["stage"], r["size"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        old = previous.get((result["stage"], result["size"]))
+        if old is None:
+            continue
+        slower = result["seconds"] > old["seconds"] * tolerance and \
+            result["seconds"] - old["seconds"] > NOISE_FLOOR_SECONDS
+        if slower:
+            regressions.append(f"{result['stage']} @ {result['size']}: {result['seconds'] * 1000:.2f} ms "
+                               f"vs baseline {old['seconds'] * 1000:.2f} ms "
+                               f"({result['seconds'] / old['seconds']:.2f}x)")
+        if result["peak_bytes"] > old["peak_bytes"] * tolerance and result["peak_bytes"] - old["peak_bytes"] > 1e6:
+            regressions.append(f"{result['stage']} @ {result['size']}: peak {result['peak_bytes'] / 1e6:.2f} MB "
+                               f"vs baseline {old['peak_bytes'] / 1e6:.2f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each summarization pipeline stage.")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--stages", nargs="+",
+                        default=["tokenize", "scores", "summary", "ingest_txt", "read_txt", "read_pdf", "read_docx",
+                                 "abstractive", "translate", "translate_local"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--abstractive-model", default=TINY_SUMMARIZATION_MODEL)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed slowdown factor vs the baseline")
+    parser.add_argument("--ci", action="store_true",
+                        help="Fail instead of passing when there is no baseline to compare with")
+    parser.add_argument("--output", help="Also write the full results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = run(args.stages, args.sizes, args.repeat, args.abstractive_model)
+    report = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "results": results,
+        "scaling": scaling_report(results),
+    }
+    print("scaling exponents (1.0 = linear):", file=sys.stderr)
+    for stage, exponent in report["scaling"].items():
+        print(f"  {stage:12s} {exponent:.2f}" if exponent is not None else f"  {stage:12s} n/a", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one", file=sys.stderr)
+        return 1 if args.ci else 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Cold-start benchmark: import time of the app modules and time to first paint of the login page.
+Each measurement runs in a fresh interpreter so nothing is already imported.
+
+    python -m benchmarks.startup --repeat 5 --max-first-paint 1.0
+
+Also reports the time the heavy libraries take to import when the first summary is
+requested, as recorded by lazy_imports.import_timings.
+
+Exits non-zero when the median first paint exceeds the budget or when a heavy library
+is imported before the first summary is requested.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import dashboard
+elapsed = time.perf_counter() - start
+from lazy_imports import HEAVY_MODULES
+print(json.dumps({"seconds": elapsed, "heavy_loaded": [m for m in HEAVY_MODULES if m in sys.modules]}))
+"""
+
+FIRST_PAINT_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=60)
+app.run()
+elapsed = time.perf_counter() - start
+from lazy_imports import HEAVY_MODULES
+print(json.dumps({
+    "seconds": elapsed,
+    "title": app.title[0].value if app.title else None,
+    "heavy_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+}))
+"""
+
+DEFERRED_IMPORT_SCRIPT = """
+import json
+import dashboard
+from lazy_imports import preload, import_timings
+preload(background=False)
+print(json.dumps(import_timings()))
+"""
+
+
+def run_fresh(script):
+    env = dict(os.environ, SUMMARIZER_PRELOAD="off")
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(limit=10):
+    """Modules with the largest cumulative import time when importing the dashboard."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import dashboard"], cwd=ROOT,
+                            capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            continue
+        rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and first paint of the app.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-first-paint", type=float, default=1.0, help="Budget in seconds for the median")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    imports = [run_fresh(IMPORT_SCRIPT) for _ in range(args.repeat)]
+    paints = [run_fresh(FIRST_PAINT_SCRIPT) for _ in range(args.repeat)]
+    deferred = [run_fresh(DEFERRED_IMPORT_SCRIPT) for _ in range(args.repeat)]
+    results = {
+        "import_median_s": statistics.median(r["seconds"] for r in imports),
+        "first_paint_median_s": statistics.median(r["seconds"] for r in paints),
+        "first_paint_max_s": max(r["seconds"] for r in paints),
+        "heavy_loaded_at_startup": sorted({m for r in imports + paints for m in r["heavy_loaded"]}),
+        "slowest_imports": slowest_imports(),
+        # Modules that failed to import are missing from some runs
+        "deferred_imports_median_s": {name: statistics.median(r[name] for r in deferred if name in r)
+                                      for name in sorted({name for r in deferred for name in r})},
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"import dashboard: {results['import_median_s']:.3f}s (median of {args.repeat})")
+        print(f"login first paint: {results['first_paint_median_s']:.3f}s "
+              f"(median, max {results['first_paint_max_s']:.3f}s)")
+        print("slowest imports (cumulative):")
+        for seconds, name in results["slowest_imports"]:
+            print(f"  {seconds:7.3f}s  {name}")
+        print("deferred until the first summary (median):")
+        for name, seconds in results["deferred_imports_median_s"].items():
+            print(f"  {seconds:7.3f}s  {name}")
+
+    failed = False
+    if results["heavy_loaded_at_startup"]:
+        print(f"FAIL: heavy modules imported at startup: {results['heavy_loaded_at_startup']}", file=sys.stderr)
+        failed = True
+    if results["first_paint_median_s"] > args.max_first_paint:
+        print(f"FAIL: first paint {results['first_paint_median_s']:.3f}s exceeds budget "
+              f"{args.max_first_paint:.3f}s", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+One digest of many related documents.
+
+Sentences from every document are pooled, near-duplicates are removed with MinHash
+signatures and locality-sensitive hashing, and the remaining sentences are summarized
+extractively or abstractively. MinHash/LSH only compares sentences that share a band
+of their signature, so the cost grows with the number of sentences rather than with
+the number of sentence pairs.
+"""
+import re
+import time
+import hashlib
+import itertools
+
+from lazy_imports import lazy_import
+from text_processing import sentence_spans, get_sentence_scores, get_summary
+from summarization_methods import abstractive_summary
+from tracing import trace_stage
+
+np = lazy_import("numpy")
+
+# Sentences whose estimated Jaccard similarity of word shingles reaches this are duplicates
+DUPLICATE_THRESHOLD = 0.8
+SHINGLE_WORDS = 3
+# 16 bands of 4 rows make sentences at 0.8 similarity candidates with probability above 0.999
+NUM_BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERMUTATIONS = NUM_BANDS * ROWS_PER_BAND
+# Shingles hashed per numpy block, bounding the (shingles x permutations) matrix
+SHINGLE_BLOCK = 1 << 16
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(sentence):
+    return _WORD.findall(sentence.lower())
+
+
+def _shingle_values(word_lists, rng):
+    """
+    32-bit hashes of the word shingles of every sentence, concatenated, and the number of
+    shingles per sentence. Each distinct word is hashed once and shingle hashes are combined
+    in numpy. Sentences shorter than SHINGLE_WORDS form a single shingle.
+    """
+    lengths = np.fromiter(map(len, word_lists), dtype=np.int64, count=len(word_lists))
+    vocabulary = {}
+    word_ids = np.fromiter((vocabulary.setdefault(word, len(vocabulary))
+                            for word in itertools.chain.from_iterable(word_lists)),
+                           dtype=np.int64, count=int(lengths.sum()))
+    # blake2b rather than hash(), which is salted per process: signatures must not depend on the run
+    vocabulary_hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+         for word in vocabulary), dtype=np.uint64, count=len(vocabulary))
+    # A trailing zero is gathered for positions past the end of a sentence
+    word_hashes = np.append(vocabulary_hashes[word_ids], np.uint64(0))
+
+    word_ends = np.cumsum(lengths)
+    counts = np.maximum(lengths - SHINGLE_WORDS + 1, 1)
+    owner = np.repeat(np.arange(len(word_lists)), counts)
+    shingle_starts = (np.cumsum(counts) - counts)[owner]
+    first_word = (word_ends - lengths)[owner] + np.arange(len(owner)) - shingle_starts
+    owner_ends = word_ends[owner]
+
+    coefficients = rng.integers(1, 1 << 63, SHINGLE_WORDS, dtype=np.uint64) | np.uint64(1)
+    combined = np.zeros(len(owner), dtype=np.uint64)
+    for position, coefficient in enumerate(coefficients):
+        index = first_word + position
+        combined += word_hashes[np.where(index < owner_ends, index, -1)] * coefficient
+    # The high half depends on every word
+    return combined >> np.uint64(32), counts
+
+
+def minhash_signatures(word_lists, seed=1):
+    """(len(word_lists), NUM_PERMUTATIONS) array of MinHash values over the word shingles of each sentence."""
+    rng = np.random.default_rng(seed)
+    values, counts = _shingle_values(word_lists, rng)
+    ends = np.cumsum(counts)
+
+    # Multiply-shift hashing of the 32-bit shingle values: one independent hash per permutation
+    a = rng.integers(1, 1 << 63, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, NUM_PERMUTATIONS, dtype=np.uint64)
+    shift = np.uint64(32)
+    signatures = np.empty((len(word_lists), NUM_PERMUTATIONS), dtype=np.uint64)
+    first = 0
+    while first < len(word_lists):
+        # Whole sentences per block, so each minimum is taken within one block
+        offset = ends[first - 1] if first else 0
+        last = max(first + 1, int(np.searchsorted(ends, offset + SHINGLE_BLOCK, side="right")))
+        hashed = (values[offset:ends[last - 1], None] * a + b) >> shift
+        signatures[first:last] = np.minimum.reduceat(hashed, ends[first:last] - counts[first:last] - offset, axis=0)
+        first = last
+    return signatures
+
+
+def deduplicate_sentences(sentences, threshold=DUPLICATE_THRESHOLD):
+    """
+    Indices of the sentences to keep, in order. A sentence is dropped when an earlier
+    kept sentence shares an LSH band with it and their signatures agree on at least
+    threshold of their positions.
+    """
+    if not sentences:
+        return []
+    # Exact repeats after lowercasing and dropping punctuation are removed before hashing
+    first_seen = {}
+    word_lists = []
+    for index, sentence in enumerate(sentences):
+        words = _words(sentence)
+        key = " ".join(words)
+        if key not in first_seen:
+            first_seen[key] = index
+            word_lists.append(words)
+    representatives = np.fromiter(first_seen.values(), dtype=np.int64, count=len(first_seen))
+
+    signatures = minhash_signatures(word_lists)
+    # One 64-bit key per band; colliding keys are re-checked against the full signature
+    band_coefficients = np.random.default_rng(0).integers(1, 1 << 63, ROWS_PER_BAND, dtype=np.uint64)
+    band_keys = (signatures.reshape(len(word_lists), NUM_BANDS, ROWS_PER_BAND) * band_coefficients).sum(axis=2)
+    required = threshold * NUM_PERMUTATIONS
+
+    # Sentences whose band keys are all unique in the corpus have no candidates and are kept
+    # without entering the Python loop below, which only sees sentences that share a bucket
+    shared = np.zeros(len(word_lists), dtype=bool)
+    for band in range(NUM_BANDS):
+        _, inverse, counts = np.unique(band_keys[:, band], return_inverse=True, return_counts=True)
+        shared |= counts[inverse] > 1
+    shared_indices = np.flatnonzero(shared)
+
+    buckets = [{} for _ in range(NUM_BANDS)]  # band key -> indices of kept sentences
+    dropped = []
+    for index, keys in zip(shared_indices.tolist(), band_keys[shared_indices].tolist()):
+        candidates = set()
+        for band, key in zip(buckets, keys):
+            candidates.update(band.get(key, ()))
+        if candidates:
+            candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            agreement = np.count_nonzero(signatures[candidates] == signatures[index], axis=1)
+            if agreement.max() >= required:
+                dropped.append(index)
+                continue
+        for band, key in zip(buckets, keys):
+            band.setdefault(key, []).append(index)
+    keep = np.ones(len(word_lists), dtype=bool)
+    keep[dropped] = False
+    return representatives[keep].tolist()
+
+
+def summarize_corpus(documents, method="extractive", top_n=5, threshold=DUPLICATE_THRESHOLD,
+                     progress_callback=None, partial_callback=None):
+    """
+    Summarize a list of (name, text) documents as one corpus.
+    Returns (summary, stats), where stats reports the sentences and characters removed
+    as near-duplicates and the time spent on deduplication and on summarization.
+    estimated_seconds_saved assumes summarization time grows linearly with input size.
+    """
+    sentences = []
+    for _, text in documents:
+        sentences.extend(text[start:end] for start, end in sentence_spans(text))
+
+    start = time.perf_counter()
+    with trace_stage("deduplicate", len(sentences)):
+        kept = [sentences[i] for i in deduplicate_sentences(sentences, threshold)]
+    dedup_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if not kept:
+        summary = "No text to summarize."
+    elif method == "extractive":
+        summary = get_summary(kept, get_sentence_scores(kept), top_n)
+    elif method == "abstractive":
+        summary = abstractive_summary(" ".join(kept), progress_callback=progress_callback,
+                                      partial_callback=partial_callback)
+    else:
+        raise ValueError(f"Unknown summarization method: {method}")
+    summarize_seconds = time.perf_counter() - start
+
+    chars_before = sum(len(sentence) for sentence in sentences)
+    chars_after = sum(len(sentence) for sentence in kept)
+    stats = {
+        "documents": len(documents),
+        "sentences": len(sentences),
+        "duplicates_removed": len(sentences) - len(kept),
+        "chars_before": chars_before,
+        "chars_after": chars_after,
+        "removed_fraction": 1 - chars_after / chars_before if chars_before else 0.0,
+        "dedup_seconds": dedup_seconds,
+        "summarize_seconds": summarize_seconds,
+        "estimated_seconds_saved": (summarize_seconds * (chars_before - chars_after) / chars_after
+                                    if chars_after else 0.0),
+    }
+    return summary, stats
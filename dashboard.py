@@ -1,9 +1,140 @@
+import uuid
 import streamlit as st
-from imports_setup import pdf_support, docx_support
-from summarization_methods import summarize
+from imports_setup import pdf_support
 from file_handlers import read_file
-from translation_service import translate_text
 from login_page import display_login_page
+import model_registry
+from tracing import collect_spans
+from job_manager import get_job_manager, DONE, FAILED
+from inference_scheduler import SchedulerBusy
+from incremental_scoring import IncrementalScorer
+from summary_cache import get_cache
+from query_index import query_summary
+from summarization_methods import input_char_limit
+
+# How long a click waits for its job before handing over to the polling progress view,
+# so quick extractive summaries still appear in the same run
+INLINE_WAIT_SECONDS = 2.0
+
+@st.fragment(run_every=1.0)
+def show_job_progress(job_key, label):
+    """Poll a background job once a second without rerunning the whole page."""
+    job = get_job_manager().get(st.session_state.get(job_key))
+    if job is None:
+        return
+    if job.is_finished:
+        # Rerun the page so the result is picked up and displayed
+        st.rerun()
+
+    snapshot = job.snapshot()
+    if snapshot["queue_position"]:
+        st.progress(0.0, text=f"{label} Waiting for the model: number {snapshot['queue_position']} in the queue")
+    elif snapshot["progress"]:
+        done, total, stage = snapshot["progress"]
+        text = f"Summarizing chunk {done}/{total}" if stage == 1 else f"Reducing summaries (round {stage})"
+        st.progress(min(done / total, 1.0), text=f"{label} {text}")
+    else:
+        st.progress(0.0, text=f"{label} ({snapshot['elapsed']:.0f}s)")
+
+    if snapshot["partial_results"]:
+        with st.expander(f"Partial results ({len(snapshot['partial_results'])} chunks)"):
+            for partial in snapshot["partial_results"]:
+                st.write(partial)
+
+    if st.button("Cancel", key=f"cancel_{job_key}", disabled=job.cancel_requested):
+        job.cancel()
+
+def collect_summary_job(job):
+    """Move a finished summary job's result into this session's state."""
+    get_job_manager().forget(job.id)
+    st.session_state.summary_job_id = None
+    if job.status == DONE:
+        if job.kind == "corpus_summary":
+            summary, stats = job.result
+            from_cache = False
+            st.caption(f"Removed {stats['duplicates_removed']} near-duplicate sentences of {stats['sentences']} "
+                       f"({stats['removed_fraction']:.0%} of the text) from {stats['documents']} documents in "
+                       f"{stats['dedup_seconds']:.2f}s, saving about {stats['estimated_seconds_saved']:.2f}s "
+                       f"of summarization.")
+        else:
+            summary, from_cache = job.result
+        if from_cache:
+            st.caption("Served from the summary cache.")
+        elif (job.kind == "summary" and job.params["method"] == "extractive"
+              and st.session_state.extractive_scorer.last_update):
+            update = st.session_state.extractive_scorer.last_update
+            if update["reused"]:
+                st.caption(f"Re-scored {update['analysed']} changed of {update['sentences']} sentences.")
+
+        # Store in session state
+        st.session_state.summary = summary
+        st.session_state.translated_summary = ""  # Reset translated summary
+        st.session_state.summary_generated = True
+        st.session_state.performance["Summarize"] = job.spans
+
+        # Calculate reduction percentage
+        original_word_count = job.params["words"]
+        summary_word_count = len(summary.split())
+        reduction = round((1 - summary_word_count / original_word_count) * 100, 1)
+
+        st.success(f"Reduced text by {reduction}% (from {original_word_count} to {summary_word_count} words)")
+    elif job.status == FAILED:
+        st.error(f"An error occurred during summarization: {job.error}")
+        st.info("Error details: " + job.error)
+    else:
+        st.info("Summarization cancelled.")
+
+def collect_translation_job(job):
+    """Move a finished translation job's result into this session's state."""
+    get_job_manager().forget(job.id)
+    st.session_state.translation_job_id = None
+    if job.status == DONE:
+        st.session_state.translated_summary = job.result
+        st.session_state.performance["Translate"] = job.spans
+    elif job.status == FAILED:
+        st.error(f"Translation error: {job.error}")
+    else:
+        st.info("Translation cancelled.")
+
+def show_performance():
+    """Per-stage timings of the last file read, summary and translation in this session, and the shared caches."""
+    with st.expander("Performance"):
+        if not st.session_state.performance:
+            st.write("Nothing measured yet.")
+        for action, spans in st.session_state.performance.items():
+            st.markdown(f"**{action}** — {sum(span['seconds'] for span in spans if span['top_level']):.3f}s")
+            st.table([{
+                "stage": "\u2003" * span["depth"] + span["stage"],
+                "ms": round(span["seconds"] * 1000, 2),
+                "input size": span["input_size"],
+                "peak memory (MB)": round(span["peak_bytes"] / 1e6, 2) if span["peak_bytes"] is not None else None,
+            } for span in spans])
+
+        # Shared by every session on this server
+        cache = get_cache().stats()
+        st.markdown("**Summary cache** (all sessions)")
+        st.table([{
+            "hit rate": f"{cache['hit_rate']:.0%}",
+            "memory hits": cache["memory_hits"],
+            "disk hits": cache["disk_hits"],
+            "misses": cache["misses"],
+            "MB not re-summarized": round(cache["bytes_saved"] / 1e6, 2),
+            "entries in memory": cache["memory_entries"],
+        }])
+
+        models = model_registry.registry.stats()
+        st.markdown("**Loaded models** (all sessions)")
+        st.table([{
+            "loaded": ", ".join(models["loaded_models"]) or "none",
+            "hit rate": f"{models['hit_rate']:.0%}",
+            "hits": models["hits"],
+            "loads": models["misses"],
+            "evictions": models["evictions"],
+            "memory (MB)": round(models["memory_bytes"] / 1e6, 1),
+        }])
+        if models["load_seconds"]:
+            st.table([{"model": model, "last load (s)": round(seconds, 2)}
+                      for model, seconds in models["load_seconds"].items()])
 
 def homepage_of_cyclone():
     # Add a logout button in the top right
@@ -12,8 +143,14 @@ def homepage_of_cyclone():
         if st.button("Logout", key="logout"):
             # Reset login state
             st.session_state.logged_in = False
+            # Stop work still running for this session
+            for key in ['summary_job_id', 'translation_job_id']:
+                job = get_job_manager().get(st.session_state.get(key))
+                if job is not None:
+                    job.cancel()
             # Clear other session state variables if needed
-            for key in ['summary', 'translated_summary', 'summary_generated']:
+            for key in ['summary', 'translated_summary', 'summary_generated', 'performance',
+                        'summary_job_id', 'translation_job_id', 'extractive_scorer', 'query_index']:
                 if key in st.session_state:
                     del st.session_state[key]
             # Rerun the app to show the login page
@@ -31,74 +168,152 @@ def homepage_of_cyclone():
         st.session_state.translated_summary = ""
     if 'summary_generated' not in st.session_state:
         st.session_state.summary_generated = False
+    if 'performance' not in st.session_state:
+        st.session_state.performance = {}
+    # Handles of background jobs, kept across reruns so the page reattaches instead of restarting them
+    if 'summary_job_id' not in st.session_state:
+        st.session_state.summary_job_id = None
+    if 'translation_job_id' not in st.session_state:
+        st.session_state.translation_job_id = None
+    # Keeps term counts of the last text summarized, so re-summarizing after an edit only analyses changed sentences
+    if 'extractive_scorer' not in st.session_state:
+        st.session_state.extractive_scorer = IncrementalScorer()
+    # Model calls are queued fairly per session across everyone using this server
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    # Inverted index of the last document searched, so follow-up questions skip re-indexing
+    if 'query_index' not in st.session_state:
+        st.session_state.query_index = None
 
     # Rest of your homepage code remains the same
-    # Create tabs for different input methods
-    tab1, tab2 = st.tabs(["Text Input", "File Upload"])
+    # Which input is summarized is an explicit choice, so content left in another tab never overrides it
+    source = st.radio("Summarize from:", ["Text Input", "File Upload", "Multiple Files"], horizontal=True,
+                      key="input_source")
+    tab1, tab2, tab3 = st.tabs(["Text Input", "File Upload", "Multiple Files"])
+    # DOCX is read with the built-in streaming extractor, python-docx is only a fallback
+    accepted_types = ["txt", "docx", "doc"]
+    if pdf_support:
+        accepted_types.append("pdf")
+    # Shown below the inputs but filled in first, so any configured upload limit for the method is known before reading
+    options_area = st.container()
+    with options_area:
+        # Summarization options
+        st.subheader("Summarization Options")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            method = st.radio("Select summarization method:", ["extractive", "abstractive", "query-focused"],
+                              key="method")
+
+        with col2:
+            top_n = st.slider("Number of key sentences (extractive only):", 1, 10, 2)
+
+        query = ""
+        if method == "query-focused":
+            query = st.text_input("Topic or question to focus on:")
+
+    max_chars = input_char_limit(method, top_n)
 
     with tab1:
         text_input = st.text_area("Enter the text to summarize:", height=250)
-        
+
     with tab2:
-        accepted_types = ["txt"]
-        if pdf_support:
-            accepted_types.append("pdf")
-        if docx_support:
-            accepted_types.extend(["docx", "doc"])
-        
         uploaded_file = st.file_uploader(f"Upload a file ({', '.join(accepted_types)})", type=accepted_types)
         file_text = None
-        
-        if uploaded_file is not None:
+
+        # Uploads are only read while their input is selected
+        if uploaded_file is not None and source == "File Upload":
             with st.spinner("Reading file..."):
-                file_text = read_file(uploaded_file)
-            
+                read_progress = st.progress(0.0)
+
+                def show_read_progress(pages_done, total_pages):
+                    read_progress.progress(pages_done / total_pages, text=f"Reading page {pages_done}/{total_pages}")
+
+                with collect_spans() as spans:
+                    file_text = read_file(uploaded_file, progress_callback=show_read_progress, max_chars=max_chars)
+                st.session_state.performance["Read file"] = spans
+                read_progress.empty()
+
             if file_text:
                 st.success("File successfully loaded!")
+                if max_chars is not None and len(file_text) >= max_chars:
+                    st.warning(f"File truncated: only the first {len(file_text):,} characters were read and "
+                               f"will be summarized (upload limit for {method} summaries).")
                 with st.expander("Preview uploaded text"):
                     st.write(file_text[:500] + "..." if len(file_text) > 500 else file_text)
 
-    # Determine which text to use (input or file)
-    text_to_summarize = ""
-    if tab2._active and file_text:
-        text_to_summarize = file_text
+    with tab3:
+        uploaded_files = st.file_uploader(f"Upload related files for one combined summary ({', '.join(accepted_types)})",
+                                          type=accepted_types, accept_multiple_files=True)
+        corpus_documents = []
+        if uploaded_files and source == "Multiple Files":
+            with st.spinner(f"Reading {len(uploaded_files)} files..."):
+                with collect_spans() as spans:
+                    for corpus_file in uploaded_files:
+                        corpus_text = read_file(corpus_file)
+                        if corpus_text:
+                            corpus_documents.append((corpus_file.name, corpus_text))
+                st.session_state.performance["Read files"] = spans
+            if corpus_documents:
+                st.success(f"Loaded {len(corpus_documents)} files. Near-duplicate sentences across them "
+                           f"are removed before summarizing.")
+
+    if source == "Multiple Files":
+        text_to_summarize = "\n".join(text for _, text in corpus_documents)
+    elif source == "File Upload":
+        text_to_summarize = file_text or ""
     else:
         text_to_summarize = text_input
 
-    # Summarization options
-    st.subheader("Summarization Options")
-    col1, col2 = st.columns(2)
-
-    with col1:
-        method = st.radio("Select summarization method:", ["extractive", "abstractive"])
-
-    with col2:
-        top_n = st.slider("Number of key sentences (extractive only):", 1, 10, 2)
+    jobs = get_job_manager()
 
     # Summarize button functionality
     if st.button("Summarize"):
-        if text_to_summarize.strip():
-            with st.spinner("Generating summary..."):
-                try:
-                    summary = summarize(text_to_summarize, method, top_n)
-                    
-                    # Store in session state
+        if method == "query-focused" and text_to_summarize.strip():
+            if not query.strip():
+                st.warning("Please enter a topic or question to focus on.")
+            else:
+                # Answered inline: the index is built once per document and each query takes milliseconds
+                with st.spinner("Searching..."), collect_spans() as spans:
+                    summary, st.session_state.query_index = query_summary(
+                        text_to_summarize, query, top_n, st.session_state.query_index)
+                st.session_state.performance["Search"] = spans
+                if summary:
                     st.session_state.summary = summary
-                    st.session_state.translated_summary = ""  # Reset translated summary
+                    st.session_state.translated_summary = ""
                     st.session_state.summary_generated = True
-                    
-                    # Calculate reduction percentage
-                    original_word_count = len(text_to_summarize.split())
-                    summary_word_count = len(summary.split())
-                    reduction = round((1 - summary_word_count / original_word_count) * 100, 1)
-                    
-                    st.success(f"Reduced text by {reduction}% (from {original_word_count} to {summary_word_count} words)")
-                except Exception as e:
-                    st.error(f"An error occurred during summarization: {str(e)}")
-                    st.info("Error details: " + str(e))
+                else:
+                    st.info("No sentences match that topic or question.")
+        elif text_to_summarize.strip():
+            # A new request replaces a summary still running for this session
+            previous_job = jobs.get(st.session_state.summary_job_id)
+            if previous_job and not previous_job.is_finished:
+                previous_job.cancel()
+            try:
+                if source == "Multiple Files":
+                    job = jobs.submit_corpus_summary(corpus_documents, method, top_n,
+                                                     session_id=st.session_state.session_id)
+                else:
+                    job = jobs.submit_summary(text_to_summarize, method, top_n,
+                                              scorer=st.session_state.extractive_scorer,
+                                              session_id=st.session_state.session_id)
+            except SchedulerBusy as e:
+                st.session_state.summary_job_id = None
+                st.warning(str(e))
+            else:
+                st.session_state.summary_job_id = job.id
+                job.wait(INLINE_WAIT_SECONDS)
         else:
             st.warning("Please enter some text or upload a file to summarize.")
 
+    # Reattach to a summary started on an earlier run, e.g. before a widget change or tab switch
+    summary_job = jobs.get(st.session_state.summary_job_id)
+    if summary_job is not None:
+        if summary_job.is_finished:
+            collect_summary_job(summary_job)
+        else:
+            show_job_progress("summary_job_id", "Generating summary...")
+
     # Display summary section
     if st.session_state.summary_generated:
         st.subheader("🔹 Summary:")
@@ -106,14 +321,27 @@ def homepage_of_cyclone():
         
         # Translation button
         if st.button("Translate to Tamil"):
-            with st.spinner("Translating to Tamil..."):
-                translated_text = translate_text(st.session_state.summary)
-                st.session_state.translated_summary = translated_text
+            try:
+                job = jobs.submit_translation(st.session_state.summary, session_id=st.session_state.session_id)
+            except SchedulerBusy as e:
+                st.warning(str(e))
+            else:
+                st.session_state.translation_job_id = job.id
+                job.wait(INLINE_WAIT_SECONDS)
+
+        translation_job = jobs.get(st.session_state.translation_job_id)
+        if translation_job is not None:
+            if translation_job.is_finished:
+                collect_translation_job(translation_job)
+            else:
+                show_job_progress("translation_job_id", "Translating to Tamil...")
         
         # Display translation if available
         if st.session_state.translated_summary:
             st.subheader("🔹 Tamil Translation:")
             st.write(st.session_state.translated_summary)
 
+    show_performance()
+
     st.markdown("---")
     st.info("Breathe In...Breathe Out...")
\ No newline at end of file
@@ -1,65 +1,298 @@
 import io
+import os
+import re
+import shutil
+import zipfile
+import logging
+import tempfile
+import threading
+import importlib.util
+import multiprocessing
+from xml.parsers import expat
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import streamlit as st
+from tracing import trace_stage
+from text_ingestion import read_text, UploadTooLarge, MAX_UPLOAD_BYTES
 
-# These variables should be imported from imports_setup.py in a real application
-# They're included here for completeness
-pdf_support = False
-docx_support = False
+logger = logging.getLogger(__name__)
 
-def extract_text_from_pdf(file):
+# Detect optional dependencies without importing them
+pdf_support = importlib.util.find_spec("PyPDF2") is not None
+docx_support = importlib.util.find_spec("docx") is not None
+
+# PDFs with more pages than this are split into page ranges across a process pool
+PARALLEL_PAGE_THRESHOLD = 50
+PDF_WORKERS = int(os.environ.get("SUMMARIZER_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Page extraction pools, one per worker count, started on first use and reused by every upload
+_pdf_executors = {}
+_pdf_executors_lock = threading.Lock()
+
+def _pdf_executor(workers):
+    """
+    Return the shared process pool for PDF extraction.
+    Workers are started with forkserver (spawn where it is unavailable) rather than fork,
+    which would copy the server's threads, locks and loaded models into every worker.
+    """
+    with _pdf_executors_lock:
+        executor = _pdf_executors.get(workers)
+        if executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+            _pdf_executors[workers] = executor
+        return executor
+
+def _extract_page_range(path, start, end):
+    """Worker: extract pages [start, end) from the PDF at path."""
+    import PyPDF2
+    reader = PyPDF2.PdfReader(path)
+    return [(reader.pages[i].extract_text() or "") for i in range(start, end)]
+
+def _discard_pdf_executor(workers, executor):
+    """Forget a broken pool so the next upload starts a fresh one."""
+    with _pdf_executors_lock:
+        if _pdf_executors.get(workers) is executor:
+            del _pdf_executors[workers]
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def _iter_parallel_pages(file, reader, total_pages, workers):
+    """
+    Yield page texts extracted in the shared pool. If a worker dies, the pool is discarded
+    and the remaining pages are read in this process.
+    """
+    file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as spool:
+        shutil.copyfileobj(file, spool)
+    # Several ranges per worker so early pages come back quickly and work stays balanced
+    range_size = max(1, -(-total_pages // (workers * 4)))
+    executor = _pdf_executor(workers)
+    futures = []
+    pages_done = 0
+    try:
+        try:
+            futures = [executor.submit(_extract_page_range, spool.name, start, min(start + range_size, total_pages))
+                       for start in range(0, total_pages, range_size)]
+            for future in futures:
+                for text in future.result():
+                    pages_done += 1
+                    yield text
+            return
+        except BrokenProcessPool:
+            logger.warning("PDF worker pool broke after %d/%d pages; reading the rest in process",
+                           pages_done, total_pages)
+            _discard_pdf_executor(workers, executor)
+        for page_number in range(pages_done, total_pages):
+            yield reader.pages[page_number].extract_text() or ""
+    finally:
+        # Ranges not started yet are dropped; the pool stays up for the next upload
+        for future in futures:
+            future.cancel()
+        os.unlink(spool.name)
+
+def iter_pdf_pages(file, progress_callback=None, max_chars=None, workers=PDF_WORKERS):
+    """
+    Yield the text of each page of a PDF in order.
+    Large PDFs are spooled to a temporary file once and page ranges are extracted in
+    worker processes. Iteration stops early once max_chars characters have been yielded.
+    progress_callback(pages_done, total_pages) is called after every page.
+    """
+    import PyPDF2
+    file.seek(0)
+    reader = PyPDF2.PdfReader(file)
+    total_pages = len(reader.pages)
+    if total_pages <= PARALLEL_PAGE_THRESHOLD or workers <= 1:
+        texts = (page.extract_text() or "" for page in reader.pages)
+    else:
+        texts = _iter_parallel_pages(file, reader, total_pages, workers)
+
+    collected = 0
+    try:
+        for page_number, text in enumerate(texts, start=1):
+            collected += len(text)
+            if progress_callback:
+                progress_callback(page_number, total_pages)
+            yield text
+            if max_chars is not None and collected >= max_chars:
+                return
+    finally:
+        texts.close()
+
+def extract_text_from_pdf(file, progress_callback=None, max_chars=None):
     """Extract text from a PDF file."""
     if not pdf_support:
         st.error("PDF support is not available. Please install PyPDF2 with: pip install PyPDF2")
         return None
     
     try:
-        import PyPDF2
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file.getvalue()))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+        buffer = io.StringIO()
+        for text in iter_pdf_pages(file, progress_callback, max_chars):
+            buffer.write(text)
+            buffer.write("\n")
+        return buffer.getvalue()
     except Exception as e:
         st.error(f"Error extracting text from PDF: {str(e)}")
         return None
 
+_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_W_P, _W_T, _W_TAB = _W + "p", _W + "t", _W + "tab"
+_W_BREAKS = (_W + "br", _W + "cr")
+# Text-bearing parts after the main document, in the order they are appended
+_DOCX_EXTRA_PARTS = re.compile(r"word/(header\d*|footer\d*|footnotes|endnotes)\.xml")
+_DOCX_PART_ORDER = ("header", "footer", "footnotes", "endnotes")
+# Compressed XML is inflated and parsed this many bytes at a time
+_DOCX_READ_BYTES = 256 * 1024
+
+def _docx_part_order(name):
+    stem = name[len("word/"):-len(".xml")]
+    kind = stem.rstrip("0123456789")
+    return _DOCX_PART_ORDER.index(kind), int(stem[len(kind):] or 0)
+
+def _iter_part_paragraphs(stream):
+    """
+    Yield the text of each w:p in a WordprocessingML part.
+    Expat callbacks only collect run text, so no element tree is built and memory stays
+    at one read buffer plus the paragraphs finished in it.
+    """
+    paragraphs = []  # text runs of each open paragraph; text boxes nest paragraphs inside runs
+    finished = []
+    state = {"in_text": False, "fallback_depth": 0}
+
+    def start(name, attributes):
+        if name == _W_P:
+            paragraphs.append([])
+        elif name == _MC_FALLBACK:
+            # Alternate content repeats its text in the fallback for older readers
+            state["fallback_depth"] += 1
+        elif state["fallback_depth"] or not paragraphs:
+            pass
+        elif name == _W_T:
+            state["in_text"] = True
+        elif name == _W_TAB:
+            paragraphs[-1].append("\t")
+        elif name in _W_BREAKS:
+            paragraphs[-1].append("\n")
+
+    def end(name):
+        if name == _W_T:
+            state["in_text"] = False
+        elif name == _W_P:
+            text = "".join(paragraphs.pop())
+            if not state["fallback_depth"]:
+                finished.append(text)
+        elif name == _MC_FALLBACK:
+            state["fallback_depth"] -= 1
+
+    def characters(data):
+        if state["in_text"]:
+            paragraphs[-1].append(data)
+
+    parser = expat.ParserCreate(namespace_separator="}")
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = characters
+    while True:
+        data = stream.read(_DOCX_READ_BYTES)
+        parser.Parse(data, not data)
+        yield from finished
+        finished.clear()
+        if not data:
+            break
+
+def iter_docx_paragraphs(file):
+    """
+    Yield paragraph text from a DOCX file object by streaming its XML parts: the main
+    document (including tables) first, then headers, footers, footnotes and endnotes.
+    """
+    file.seek(0)
+    with zipfile.ZipFile(file) as archive:
+        names = archive.namelist()
+        extra = sorted((name for name in names if _DOCX_EXTRA_PARTS.fullmatch(name)), key=_docx_part_order)
+        for name in ["word/document.xml"] + extra:
+            with archive.open(name) as part:
+                yield from _iter_part_paragraphs(part)
+
+def docx_text(file):
+    """
+    Return the text of a DOCX file object.
+    Falls back to python-docx, body paragraphs only, if the package cannot be streamed.
+    """
+    try:
+        buffer = io.StringIO()
+        for paragraph in iter_docx_paragraphs(file):
+            buffer.write(paragraph)
+            buffer.write("\n")
+        return buffer.getvalue()
+    except (zipfile.BadZipFile, KeyError, expat.ExpatError):
+        if not docx_support:
+            raise
+    import docx
+    file.seek(0)
+    doc = docx.Document(file)
+    return "".join(para.text + "\n" for para in doc.paragraphs)
+
 def extract_text_from_docx(file):
     """Extract text from a DOCX file."""
-    if not docx_support:
-        st.error("DOCX support is not available. Please install python-docx with: pip install python-docx")
-        return None
-    
     try:
-        import docx
-        doc = docx.Document(io.BytesIO(file.getvalue()))
-        text = ""
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
+        return docx_text(file)
     except Exception as e:
         st.error(f"Error extracting text from DOCX: {str(e)}")
         return None
 
-def read_file(uploaded_file):
-    """Read text from various file formats."""
-    try:
-        if uploaded_file.type == "text/plain":
-            # For text files
-            return uploaded_file.getvalue().decode("utf-8")
+def read_file(uploaded_file, progress_callback=None, max_chars=None):
+    """
+    Read text from various file formats.
+    Text files are decoded block by block in their detected encoding; max_chars limits
+    the text returned and progress_callback reports PDF pages.
+    """
+    with trace_stage("read_file", getattr(uploaded_file, "size", None)):
+        try:
+            size = getattr(uploaded_file, "size", None)
+            if size is not None and size > MAX_UPLOAD_BYTES:
+                raise UploadTooLarge(f"File is {size / 1e6:.1f} MB; the limit is {MAX_UPLOAD_BYTES / 1e6:.0f} MB")
+
+            if uploaded_file.type == "text/plain":
+                # For text files
+                return read_text(uploaded_file, max_chars)
         
-        elif uploaded_file.type == "application/pdf" and pdf_support:
-            # For PDF files
-            return extract_text_from_pdf(uploaded_file)
+            elif uploaded_file.type == "application/pdf" and pdf_support:
+                # For PDF files
+                return extract_text_from_pdf(uploaded_file, progress_callback, max_chars)
         
-        elif uploaded_file.type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", 
-                                    "application/msword"] and docx_support:
-            # For DOCX and DOC files
-            return extract_text_from_docx(uploaded_file)
+            elif uploaded_file.type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", 
+                                        "application/msword"]:
+                # For DOCX and DOC files
+                return extract_text_from_docx(uploaded_file)
         
-        else:
-            st.error(f"Unsupported file type: {uploaded_file.type}. Please upload a .txt, .pdf, or .docx file.")
-            return None
+            else:
+                st.error(f"Unsupported file type: {uploaded_file.type}. Please upload a .txt, .pdf, or .docx file.")
+                return None
     
-    except Exception as e:
-        st.error(f"Error reading file: {str(e)}")
-        return None
\ No newline at end of file
+        except UploadTooLarge as e:
+            st.error(str(e))
+            return None
+        except Exception as e:
+            st.error(f"Error reading file: {str(e)}")
+            return None
+
+# File extensions accepted by read_path
+SUPPORTED_EXTENSIONS = (".txt", ".pdf", ".docx")
+
+def read_path(path, pdf_workers=PDF_WORKERS):
+    """
+    Read text from a file on disk without Streamlit.
+    Raises ValueError for unsupported types instead of reporting through st.error.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".txt":
+        with open(path, "rb") as f:
+            return read_text(f)
+    elif extension == ".pdf" and pdf_support:
+        with open(path, "rb") as f:
+            return "".join(text + "\n" for text in iter_pdf_pages(f, workers=pdf_workers))
+    elif extension == ".docx":
+        with open(path, "rb") as f:
+            return docx_text(f)
+    raise ValueError(f"Unsupported file type: {extension or path}")
\ No newline at end of file
@@ -0,0 +1,278 @@
+"""
+Corpus-level IDF statistics for extractive scoring.
+
+Terms are hashed into a fixed number of columns, so the artifact needs no vocabulary:
+it is one document-frequency array saved as .npy next to a small JSON header, and is
+memory-mapped on load. Scoring with it only transforms the input, without fitting.
+
+    python idf_model.py build reports/ --output idf/           # from txt/pdf/docx files
+    python idf_model.py info idf/
+
+Set SUMMARIZER_IDF_MODEL=idf/ to score extractive summaries with it, and
+SUMMARIZER_IDF_UPDATE=1 to keep adding summarized documents to it in the background.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from lazy_imports import lazy_import
+from tracing import trace_stage
+
+logger = logging.getLogger(__name__)
+
+np = lazy_import("numpy")
+sparse = lazy_import("scipy.sparse")
+sklearn_text = lazy_import("sklearn.feature_extraction.text")
+sklearn_preprocessing = lazy_import("sklearn.preprocessing")
+
+IDF_MODEL_PATH = os.environ.get("SUMMARIZER_IDF_MODEL", "")
+IDF_UPDATE = os.environ.get("SUMMARIZER_IDF_UPDATE", "0") == "1"
+# 2**20 columns keep hash collisions rare for English; the artifact is 4 bytes per column
+N_FEATURES = 2 ** 20
+# Background updates are held back until this many new documents have arrived, then applied
+# and written to disk together, so the statistics and their fingerprint (part of every
+# extractive summary cache key) change once per batch rather than once per document
+UPDATE_BATCH_DOCUMENTS = 50
+
+FREQUENCY_FILE = "document_frequency.npy"
+HEADER_FILE = "idf.json"
+FORMAT_VERSION = 1
+
+
+class IdfModel:
+    """Document frequencies of hashed terms over a reference corpus."""
+
+    def __init__(self, document_frequency, n_documents, path=None):
+        self.document_frequency = document_frequency
+        self.n_documents = n_documents
+        self.path = path
+        self._idf = None
+        self._fingerprint = None
+        self._vectorizer = None
+        self._lock = threading.Lock()
+        self._pending_frequency = None
+        self._pending_documents = 0
+        self._learned = set()  # digests of documents queued for a background update
+        self._updater = None
+
+    @property
+    def n_features(self):
+        return len(self.document_frequency)
+
+    @property
+    def fingerprint(self):
+        """Hash of the statistics, for cache keys: every update changes it, and equal statistics agree across processes."""
+        fingerprint = self._fingerprint
+        if fingerprint is None:
+            with self._lock:
+                digest = hashlib.blake2b(str(self.n_documents).encode("ascii"), digest_size=16)
+                digest.update(np.ascontiguousarray(self.document_frequency, dtype=np.uint32))
+                fingerprint = self._fingerprint = f"idf-{digest.hexdigest()}"
+        return fingerprint
+
+    @property
+    def vectorizer(self):
+        if self._vectorizer is None:
+            # Same tokenization and stop words as the per-document TfidfVectorizer
+            self._vectorizer = sklearn_text.HashingVectorizer(
+                n_features=self.n_features, stop_words="english", alternate_sign=False, norm=None)
+        return self._vectorizer
+
+    @property
+    def idf(self):
+        idf = self._idf
+        if idf is None:
+            # Smoothed IDF as TfidfVectorizer computes it
+            idf = np.log((1.0 + self.n_documents) / (1.0 + self.document_frequency)) + 1.0
+            self._idf = idf
+        return idf
+
+    @classmethod
+    def empty(cls, n_features=N_FEATURES):
+        return cls(np.zeros(n_features, dtype=np.uint32), 0)
+
+    @classmethod
+    def build(cls, documents, n_features=N_FEATURES):
+        model = cls.empty(n_features)
+        model.update(documents)
+        return model
+
+    def _frequencies(self, documents):
+        counts = self.vectorizer.transform(documents).tocsr()
+        counts.sum_duplicates()
+        return np.bincount(counts.indices, minlength=self.n_features).astype(np.uint32), counts.shape[0]
+
+    def update(self, documents):
+        """Add documents to the statistics. Readers keep a consistent view while this runs."""
+        with trace_stage("idf_update"):
+            frequencies, n_new = self._frequencies(documents)
+            with self._lock:
+                # New arrays instead of in-place adds: a memory-mapped array is read-only,
+                # and concurrent transforms keep using the arrays they started with
+                self.document_frequency = self.document_frequency + frequencies
+                self.n_documents += n_new
+                self._idf = None
+                self._fingerprint = None
+        return n_new
+
+    def update_in_background(self, documents):
+        """
+        Count documents on a single background thread and apply them in batches of
+        UPDATE_BATCH_DOCUMENTS, saving each batch. A document already queued is not counted again.
+        """
+        new_documents = []
+        with self._lock:
+            for document in documents:
+                digest = hashlib.blake2b(document.encode("utf-8"), digest_size=16).digest()
+                if digest not in self._learned:
+                    self._learned.add(digest)
+                    new_documents.append(document)
+            if not new_documents:
+                return None
+            if self._updater is None:
+                self._updater = ThreadPoolExecutor(max_workers=1, thread_name_prefix="idf-update")
+        return self._updater.submit(self._update_in_batches, new_documents)
+
+    def _update_in_batches(self, documents):
+        try:
+            frequencies, n_new = self._frequencies(documents)
+            with self._lock:
+                if self._pending_frequency is None:
+                    self._pending_frequency = frequencies
+                else:
+                    self._pending_frequency += frequencies
+                self._pending_documents += n_new
+                if self._pending_documents < UPDATE_BATCH_DOCUMENTS:
+                    return
+                frequencies, n_new = self._pending_frequency, self._pending_documents
+                self._pending_frequency, self._pending_documents = None, 0
+                self.document_frequency = self.document_frequency + frequencies
+                self.n_documents += n_new
+                self._idf = None
+                self._fingerprint = None
+            if self.path:
+                self.save(self.path)
+        except Exception:
+            logger.exception("Background IDF update failed")
+
+    def transform(self, sentences):
+        """
+        L2-normalised TF-IDF rows for sentences, without fitting anything. Columns are
+        renumbered to the terms that occur, so scoring never touches all n_features columns.
+        """
+        counts = self.vectorizer.transform(sentences).tocsr()
+        terms, columns = np.unique(counts.indices, return_inverse=True)
+        weighted = sparse.csr_matrix((counts.data * self.idf[terms][columns], columns, counts.indptr),
+                                     shape=(counts.shape[0], len(terms)))
+        return sklearn_preprocessing.normalize(weighted, norm="l2", copy=False)
+
+    def save(self, path):
+        """Write the artifact atomically so a loading process never sees half of it."""
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            frequencies, n_documents = self.document_frequency, self.n_documents
+        temporary = os.path.join(path, f".{FREQUENCY_FILE}.{os.getpid()}.tmp")
+        with open(temporary, "wb") as f:
+            np.save(f, np.asarray(frequencies, dtype=np.uint32))
+        os.replace(temporary, os.path.join(path, FREQUENCY_FILE))
+        header = {"format": FORMAT_VERSION, "n_documents": n_documents, "n_features": len(frequencies),
+                  "saved": time.time()}
+        temporary = os.path.join(path, f".{HEADER_FILE}.{os.getpid()}.tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(header, f)
+        os.replace(temporary, os.path.join(path, HEADER_FILE))
+        self.path = path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, HEADER_FILE), "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported IDF model format in {path}: {header.get('format')}")
+        frequencies = np.load(os.path.join(path, FREQUENCY_FILE), mmap_mode="r" if mmap else None)
+        return cls(frequencies, header["n_documents"], path)
+
+
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_idf_model():
+    """The process-wide IDF model from SUMMARIZER_IDF_MODEL, loaded once, or None if not configured."""
+    global _model, _model_loaded
+    if _model_loaded:
+        return _model
+    with _model_lock:
+        if not _model_loaded:
+            if IDF_MODEL_PATH and os.path.exists(os.path.join(IDF_MODEL_PATH, HEADER_FILE)):
+                with trace_stage("idf_load"):
+                    _model = IdfModel.load(IDF_MODEL_PATH)
+                logger.info("Loaded IDF model from %s (%d documents)", IDF_MODEL_PATH, _model.n_documents)
+            elif IDF_MODEL_PATH:
+                logger.warning("No IDF model at %s; fitting IDF per document", IDF_MODEL_PATH)
+            _model_loaded = True
+    return _model
+
+
+def learn_from(text):
+    """
+    Add a newly summarized document to the shared model in the background, if updates are enabled.
+    Call it only for summaries that were computed, not served from the cache.
+    """
+    model = get_idf_model()
+    if model is not None and IDF_UPDATE and text.strip():
+        model.update_in_background([text])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect a corpus IDF model.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Count document frequencies over txt/pdf/docx files")
+    build.add_argument("source", help="Directory to walk, or a manifest file with one path per line")
+    build.add_argument("-o", "--output", required=True, help="Directory to write the model to")
+    build.add_argument("--n-features", type=int, default=N_FEATURES)
+    build.add_argument("--update", action="store_true", help="Add to an existing model at --output")
+    info = commands.add_parser("info", help="Show a model's header")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        model = IdfModel.load(args.path)
+        print(json.dumps({"n_documents": model.n_documents, "n_features": model.n_features,
+                          "fingerprint": model.fingerprint,
+                          "terms_seen": int(np.count_nonzero(model.document_frequency))}, indent=2))
+        return 0
+
+    from batch_summarize import find_files
+    from file_handlers import read_path
+
+    if args.update and os.path.exists(os.path.join(args.output, HEADER_FILE)):
+        model = IdfModel.load(args.output, mmap=False)
+    else:
+        model = IdfModel.empty(args.n_features)
+    paths = find_files(args.source)
+    start = time.perf_counter()
+    failed = 0
+    for i, path in enumerate(paths, start=1):
+        try:
+            model.update([read_path(path)])
+        except Exception as e:
+            failed += 1
+            print(f"skipping {path}: {e}", file=sys.stderr)
+        if i % 100 == 0:
+            print(f"{i}/{len(paths)} files", file=sys.stderr)
+    model.save(args.output)
+    print(f"Counted {model.n_documents} documents in {time.perf_counter() - start:.1f}s "
+          f"({failed} failed); wrote {args.output}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import threading
+
+from lazy_imports import lazy_import
+from tracing import trace_stage
+
+np = lazy_import("numpy")
+sparse = lazy_import("scipy.sparse")
+sklearn_text = lazy_import("sklearn.feature_extraction.text")
+
+
+class IncrementalScorer:
+    """
+    Centrality scoring that reuses work between runs on an edited document.
+
+    Tokenizing sentences and counting terms dominates the cost of fitting a
+    TfidfVectorizer, so term counts are cached per sentence and only sentences
+    that are new since the previous call are analysed. IDF weights, row
+    normalisation and centrality are then recomputed with vectorised sparse
+    operations over the cached counts; any change in the number of sentences
+    shifts every IDF weight, so this pass is linear but contains no Python-level
+    per-term work. Scores are identical to get_sentence_scores(mode="centrality").
+
+    One scorer belongs to one session; calls are serialised with a lock.
+    """
+
+    def __init__(self):
+        self._vocabulary = {}
+        self._rows = {}  # sentence text -> (term ids, term counts)
+        self._lock = threading.Lock()
+        self.last_update = None
+
+    def _analyze(self, sentences):
+        """Term ids and counts for each of sentences, counted in one CountVectorizer pass."""
+        # Same tokenization, lowercasing and stop words as the full recompute
+        vectorizer = sklearn_text.CountVectorizer(stop_words="english")
+        try:
+            counts = vectorizer.fit_transform(sentences).tocsr()
+        except ValueError:
+            # Only stop words in the new sentences
+            return [(np.zeros(0, dtype=np.int64), np.zeros(0)) for _ in sentences]
+
+        # Map this batch's column numbers onto the scorer's growing vocabulary
+        vocabulary = self._vocabulary
+        remap = np.zeros(len(vectorizer.vocabulary_), dtype=np.int64)
+        for term, column in vectorizer.vocabulary_.items():
+            remap[column] = vocabulary.setdefault(term, len(vocabulary))
+        indices = remap[counts.indices]
+        data = counts.data.astype(np.float64)
+        indptr = counts.indptr
+        return [(indices[indptr[i]:indptr[i + 1]], data[indptr[i]:indptr[i + 1]]) for i in range(len(sentences))]
+
+    def score(self, sentences):
+        """Return (index, score) pairs for a list of sentence strings."""
+        with self._lock:
+            if len(sentences) < 2:
+                return [(0, 1.0)]
+
+            previous = self._rows
+            changed = list({sentence: None for sentence in sentences if sentence not in previous})
+            with trace_stage("incremental_analyze", len(changed)):
+                analysed = dict(zip(changed, self._analyze(changed))) if changed else {}
+            # Only sentences of the latest version are kept, so memory follows the document
+            current = {sentence: previous.get(sentence) or analysed[sentence] for sentence in sentences}
+            rows = [current[sentence] for sentence in sentences]
+            self._rows = current
+            self.last_update = {"sentences": len(sentences), "analysed": len(changed),
+                                "reused": len(sentences) - len(changed)}
+
+            with trace_stage("incremental_scoring", len(sentences)):
+                return list(enumerate(self._centrality(rows).tolist()))
+
+    def score_spans(self, text, spans):
+        return self.score([text[start:end] for start, end in spans])
+
+    def _centrality(self, rows):
+        n = len(rows)
+        lengths = np.fromiter((len(ids) for ids, _ in rows), dtype=np.int64, count=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        if indptr[-1] == 0:
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+        indices = np.concatenate([ids for ids, _ in rows])
+        counts = np.concatenate([values for _, values in rows])
+
+        # Smoothed IDF exactly as TfidfVectorizer computes it
+        document_frequency = np.bincount(indices, minlength=len(self._vocabulary))
+        idf = np.log((1 + n) / (1 + document_frequency)) + 1
+        tfidf = sparse.csr_matrix((counts * idf[indices], indices, indptr), shape=(n, len(self._vocabulary)))
+
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        inverse = np.divide(1.0, norms, out=np.zeros(n), where=norms > 0)
+        tfidf = sparse.diags(inverse) @ tfidf
+
+        column_sums = np.asarray(tfidf.sum(axis=0)).ravel()
+        return tfidf @ column_sums - 1.0
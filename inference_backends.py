@@ -0,0 +1,125 @@
+"""
+CPU inference backends for seq2seq pipelines.
+
+    pytorch    the transformers pipeline as published (fp32)
+    quantized  the same model with every nn.Linear dynamically quantized to int8
+    onnx       the model exported to ONNX and run with ONNX Runtime (needs optimum[onnxruntime])
+
+Backends chosen through the environment go through resolve_backend, which replaces an
+onnx setting with pytorch when ONNX Runtime is missing, so model registry, scheduler and
+summary cache keys all name the backend that is actually loaded.
+
+The backend is independent of the model, so a distilled checkpoint such as
+DISTILLED_SUMMARIZATION_MODEL can be combined with any of them.
+"""
+import os
+import re
+import logging
+import threading
+import importlib.util
+
+from lazy_imports import import_module
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("pytorch", "quantized", "onnx")
+# Detect the optional ONNX Runtime integration without importing it
+onnx_support = (importlib.util.find_spec("onnxruntime") is not None
+                and importlib.util.find_spec("optimum") is not None
+                and importlib.util.find_spec("optimum.onnxruntime") is not None)
+# Intra-op threads per model call; 0 keeps the library default (one per core)
+INFERENCE_THREADS = int(os.environ.get("SUMMARIZER_INFERENCE_THREADS", "0"))
+# Exported ONNX models are kept here so the export only happens once per model
+ONNX_DIR = os.environ.get("SUMMARIZER_ONNX_DIR",
+                          os.path.join(os.path.expanduser("~"), ".cache", "text-summarizer", "onnx"))
+
+_threads_lock = threading.Lock()
+_torch_threads = None
+
+
+def configure_torch_threads(threads=INFERENCE_THREADS):
+    """Set PyTorch's intra-op thread count. It is process-wide, so only the first non-zero setting applies."""
+    global _torch_threads
+    if not threads:
+        return
+    with _threads_lock:
+        if _torch_threads is None:
+            torch = import_module("torch")
+            torch.set_num_threads(threads)
+            _torch_threads = threads
+        elif _torch_threads != threads:
+            logger.warning("PyTorch already uses %d threads; ignoring request for %d", _torch_threads, threads)
+
+
+def load_pytorch(task, model_name, threads=INFERENCE_THREADS):
+    configure_torch_threads(threads)
+    transformers = import_module("transformers")
+    return transformers.pipeline(task, model=model_name)
+
+
+def load_quantized(task, model_name, threads=INFERENCE_THREADS):
+    """
+    Dynamic int8 quantization: Linear weights are stored as int8 and activations are
+    quantized on the fly, which roughly quarters their memory and speeds up the matmuls
+    that dominate BART inference on CPU. No calibration data is needed.
+    """
+    configure_torch_threads(threads)
+    torch = import_module("torch")
+    transformers = import_module("transformers")
+    pipe = transformers.pipeline(task, model=model_name, framework="pt")
+    pipe.model = torch.quantization.quantize_dynamic(pipe.model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+    return pipe
+
+
+def onnx_export_dir(model_name, onnx_dir=ONNX_DIR):
+    return os.path.join(onnx_dir, re.sub(r'[^A-Za-z0-9_.-]+', '--', model_name))
+
+
+def load_onnx(task, model_name, threads=INFERENCE_THREADS, onnx_dir=ONNX_DIR):
+    try:
+        onnxruntime = import_module("onnxruntime")
+        ort_models = import_module("optimum.onnxruntime")
+    except ImportError as e:
+        raise ImportError("The onnx backend needs optimum[onnxruntime]: pip install 'optimum[onnxruntime]'") from e
+    transformers = import_module("transformers")
+
+    options = onnxruntime.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+    # Encoder and decoder run one after the other, so parallel graph execution only adds contention
+    options.inter_op_num_threads = 1
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    export_dir = onnx_export_dir(model_name, onnx_dir)
+    if os.path.isdir(export_dir):
+        model = ort_models.ORTModelForSeq2SeqLM.from_pretrained(export_dir, session_options=options)
+        tokenizer = transformers.AutoTokenizer.from_pretrained(export_dir)
+    else:
+        logger.info("Exporting %s to ONNX in %s", model_name, export_dir)
+        model = ort_models.ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True, session_options=options)
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return transformers.pipeline(task, model=model, tokenizer=tokenizer)
+
+
+LOADERS = {
+    "pytorch": load_pytorch,
+    "quantized": load_quantized,
+    "onnx": load_onnx,
+}
+
+
+def resolve_backend(backend, setting="SUMMARIZER_BACKEND"):
+    """The backend to use for a configured one: pytorch, with a warning, when onnx cannot be loaded."""
+    if backend == "onnx" and not onnx_support:
+        logger.warning("%s=onnx needs optimum[onnxruntime] (pip install 'optimum[onnxruntime]'); "
+                       "using the pytorch backend instead", setting)
+        return "pytorch"
+    return backend
+
+
+def load_pipeline(task, model_name, backend="pytorch", threads=INFERENCE_THREADS):
+    if backend not in LOADERS:
+        raise ValueError(f"Unknown inference backend {backend!r}; choose from {', '.join(BACKENDS)}")
+    return LOADERS[backend](task, model_name, threads)
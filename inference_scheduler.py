@@ -0,0 +1,226 @@
+import os
+import time
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from tracing import Histogram, DURATION_BUCKETS, register_metrics
+
+# Model calls allowed to run at once per model. Each call already uses every core, so
+# more than one per model mostly adds contention; lower SUMMARIZER_INFERENCE_THREADS to match.
+MODEL_CONCURRENCY = int(os.environ.get("SUMMARIZER_MODEL_CONCURRENCY", "1"))
+# Requests waiting per model beyond which new ones are turned away immediately
+MAX_QUEUED_REQUESTS = int(os.environ.get("SUMMARIZER_MAX_QUEUED", "16"))
+# How often a waiting request re-reports its position, which is also when it notices cancellation
+POLL_SECONDS = 0.5
+
+ANONYMOUS_SESSION = "anonymous"
+
+# (session id, on_wait callback) of the request running in this context
+_request = contextvars.ContextVar("inference_request", default=(None, None))
+
+queue_wait = Histogram("summarizer_inference_queue_wait_seconds",
+                       "Time model calls waited for an inference slot.", DURATION_BUCKETS)
+
+
+class SchedulerBusy(Exception):
+    def __init__(self, model, position):
+        self.model = model
+        self.position = position
+        super().__init__(f"The summarizer is busy: you would be number {position} in the queue. "
+                         f"Please try again in a moment.")
+
+
+@contextmanager
+def request_context(session_id, on_wait=None):
+    """
+    Attribute model calls made in this context to session_id. on_wait(position) is called
+    while a call waits for a slot, and on_wait(None) once it gets one; it may raise to give up.
+    """
+    token = _request.set((session_id, on_wait))
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+class _Ticket:
+    __slots__ = ("session", "enqueued", "granted")
+
+    def __init__(self, session):
+        self.session = session
+        self.enqueued = time.perf_counter()
+        self.granted = False
+
+
+class InferenceScheduler:
+    """
+    Process-wide gate for model calls from every session and the API.
+    Each model runs at most its concurrency limit of calls at once. Waiting calls are
+    queued per session and served round-robin across sessions, so one user submitting
+    many chunks cannot starve the others. When a model's queue is full, new calls fail
+    at once with SchedulerBusy instead of waiting into a timeout.
+
+    Background jobs that will call a model are admitted with admit() when they are
+    submitted, so a full queue turns them away before they wait anywhere else.
+    """
+
+    def __init__(self, concurrency=MODEL_CONCURRENCY, max_queued=MAX_QUEUED_REQUESTS):
+        self.concurrency = concurrency
+        self.max_queued = max_queued
+        self._limits = {}
+        self._condition = threading.Condition()
+        self._running = {}  # model -> calls holding a slot
+        self._queues = {}   # model -> OrderedDict(session -> deque of tickets), in service order
+        self._stats = {}    # model -> counters
+        self._admitted = {}  # model -> jobs admitted and not yet finished
+
+    def set_concurrency(self, model, concurrency):
+        with self._condition:
+            self._limits[model] = concurrency
+            self._grant(model)
+
+    def admit(self, model):
+        """
+        Reserve room for a job that will call model, one call at a time, until release_admission().
+        Raises SchedulerBusy when the running and waiting jobs already fill the slots and the queue.
+        """
+        with self._condition:
+            admitted = self._admitted.get(model, 0)
+            capacity = self._limits.get(model, self.concurrency) + self.max_queued
+            if admitted >= capacity:
+                self._model_stats(model)["rejected"] += 1
+                raise SchedulerBusy(model, admitted - self._limits.get(model, self.concurrency) + 1)
+            self._admitted[model] = admitted + 1
+
+    def release_admission(self, model):
+        with self._condition:
+            self._admitted[model] -= 1
+
+    def _model_stats(self, model):
+        return self._stats.setdefault(model, {"served": 0, "rejected": 0, "wait_seconds_total": 0.0,
+                                              "max_wait_seconds": 0.0})
+
+    def _queued(self, model):
+        return sum(len(tickets) for tickets in self._queues.get(model, {}).values())
+
+    def _position(self, model, ticket):
+        """1-based place of ticket in the round-robin service order."""
+        queue = self._queues[model]
+        order = list(queue)
+        session_index = order.index(ticket.session)
+        rank = queue[ticket.session].index(ticket)
+        ahead = sum(min(len(queue[session]), rank + (1 if i < session_index else 0))
+                    for i, session in enumerate(order) if i != session_index)
+        return ahead + rank + 1
+
+    def _grant(self, model):
+        # Caller holds self._condition
+        queue = self._queues.get(model)
+        limit = self._limits.get(model, self.concurrency)
+        while queue and self._running.get(model, 0) < limit:
+            session, tickets = next(iter(queue.items()))
+            ticket = tickets.popleft()
+            # The session goes to the back of the line, behind every other waiting session
+            del queue[session]
+            if tickets:
+                queue[session] = tickets
+            ticket.granted = True
+            self._running[model] = self._running.get(model, 0) + 1
+        self._condition.notify_all()
+
+    def _dequeue(self, model, ticket):
+        # Caller holds self._condition
+        tickets = self._queues[model].get(ticket.session)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del self._queues[model][ticket.session]
+
+    @contextmanager
+    def slot(self, model):
+        """Hold one of model's inference slots for the duration of the block."""
+        session, on_wait = _request.get()
+        ticket = _Ticket(session or ANONYMOUS_SESSION)
+        with self._condition:
+            queue = self._queues.setdefault(model, OrderedDict())
+            stats = self._model_stats(model)
+            queued = self._queued(model)
+            if queued >= self.max_queued:
+                stats["rejected"] += 1
+                raise SchedulerBusy(model, queued + 1)
+            queue.setdefault(ticket.session, deque()).append(ticket)
+            self._grant(model)
+            try:
+                while not ticket.granted:
+                    if on_wait:
+                        on_wait(self._position(model, ticket))
+                    self._condition.wait(POLL_SECONDS)
+            except BaseException:
+                if ticket.granted:
+                    self._release(model)
+                else:
+                    self._dequeue(model, ticket)
+                raise
+            waited = time.perf_counter() - ticket.enqueued
+            stats["served"] += 1
+            stats["wait_seconds_total"] += waited
+            stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+        queue_wait.observe(model, waited)
+
+        try:
+            if on_wait:
+                on_wait(None)
+            yield
+        finally:
+            with self._condition:
+                self._release(model)
+
+    def _release(self, model):
+        # Caller holds self._condition
+        self._running[model] -= 1
+        self._grant(model)
+
+    def stats(self):
+        """Queue depth, running calls and wait times per model."""
+        with self._condition:
+            report = {}
+            for model in set(self._stats) | set(self._queues) | set(self._admitted):
+                stats = self._model_stats(model)
+                report[model] = {
+                    "running": self._running.get(model, 0),
+                    "concurrency": self._limits.get(model, self.concurrency),
+                    "queue_depth": self._queued(model),
+                    "waiting_sessions": len(self._queues.get(model, {})),
+                    "admitted_jobs": self._admitted.get(model, 0),
+                    "served": stats["served"],
+                    "rejected": stats["rejected"],
+                    "avg_wait_seconds": stats["wait_seconds_total"] / stats["served"] if stats["served"] else 0.0,
+                    "max_wait_seconds": stats["max_wait_seconds"],
+                }
+            return report
+
+    def render_prometheus(self):
+        lines = queue_wait.render("model")
+        gauges = (
+            ("summarizer_inference_queue_depth", "Model calls waiting for an inference slot.", "queue_depth"),
+            ("summarizer_inference_running", "Model calls currently running.", "running"),
+            ("summarizer_inference_rejected_total", "Model calls turned away because the queue was full.",
+             "rejected"),
+        )
+        report = self.stats()
+        for name, help_text, field in gauges:
+            kind = "counter" if name.endswith("_total") else "gauge"
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"])
+            lines.extend(f'{name}{{model="{model}"}} {values[field]}' for model, values in sorted(report.items()))
+        return lines
+
+
+# Shared by every Streamlit session, background job and API request in this process
+scheduler = InferenceScheduler()
+register_metrics(scheduler.render_prometheus)
+
+
+def get_scheduler():
+    return scheduler
@@ -0,0 +1,237 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from summary_cache import cached_summarize
+from corpus_summarization import summarize_corpus
+from idf_model import learn_from
+from translation_service import translate_text
+from tracing import collect_spans
+from inference_scheduler import request_context, get_scheduler, SchedulerBusy
+from model_registry import SUMMARIZATION_MODEL, SUMMARIZATION_BACKEND
+from translation_service import TRANSLATION_BACKEND
+from local_translation import LOCAL_TRANSLATION_MODEL, LOCAL_TRANSLATION_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Jobs that do not call a model (extractive summaries, Google translations) share these workers
+MAX_JOB_WORKERS = int(os.environ.get("SUMMARIZER_JOB_WORKERS", "2"))
+# Scheduler keys of the models that abstractive summaries and local translations call
+SUMMARIZATION_MODEL_KEY = f"{SUMMARIZATION_MODEL}:{SUMMARIZATION_BACKEND}"
+TRANSLATION_MODEL_KEY = f"{LOCAL_TRANSLATION_MODEL}:{LOCAL_TRANSLATION_BACKEND}"
+# Finished jobs are forgotten after this long if no session picks up their result
+FINISHED_JOB_TTL_SECONDS = 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """Handle to a unit of work running on the shared worker pool."""
+
+    def __init__(self, kind, params, session_id=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.session_id = session_id
+        self.status = QUEUED
+        self.progress = None  # (done, total, stage) as reported by the worker
+        self.queue_position = None  # place in the inference queue while waiting for the model
+        self.partial_results = []
+        self.result = None
+        self.error = None
+        self.spans = []
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel_event = threading.Event()
+        self._finished_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def wait(self, timeout=None):
+        """Block until the job finishes or timeout seconds pass. Returns True if it finished."""
+        return self._finished_event.wait(timeout)
+
+    def _finish(self, status):
+        self.finished = time.time()
+        self.status = status
+        self._finished_event.set()
+
+    def cancel(self):
+        """Ask the job to stop at its next checkpoint. Jobs that have not started never run."""
+        self._cancel_event.set()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def report_progress(self, done, total, stage=1):
+        self.check_cancelled()
+        with self._lock:
+            self.progress = (done, total, stage)
+
+    def report_queue_position(self, position):
+        self.check_cancelled()
+        with self._lock:
+            self.queue_position = position
+
+    def report_partial(self, partial_results):
+        self.check_cancelled()
+        with self._lock:
+            self.partial_results = partial_results
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": self.progress,
+                "queue_position": self.queue_position,
+                "partial_results": list(self.partial_results),
+                "elapsed": (self.finished or time.time()) - (self.started or self.created),
+            }
+
+
+class JobManager:
+    """
+    Runs summarization and translation jobs for every session.
+    Jobs that call a model are admitted by the inference scheduler when submitted and get
+    their own thread, so the scheduler's fair per-session queue is the only one they wait
+    in and it sees every waiting request. Other jobs run on a bounded worker pool.
+    """
+
+    def __init__(self, max_workers=MAX_JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, params, session_id=None, model=None):
+        """
+        Run fn(job) and return the Job handle. model is the scheduler key of the model the
+        job calls, if any; SchedulerBusy is raised here when that model's queue is full.
+        """
+        job = Job(kind, params, session_id)
+        if model is not None:
+            get_scheduler().admit(model)
+        with self._lock:
+            self._expire_finished()
+            self._jobs[job.id] = job
+        if model is None:
+            self._executor.submit(self._run, job, fn)
+        else:
+            threading.Thread(target=self._run, args=(job, fn, model), name=f"job-{job.id[:8]}", daemon=True).start()
+        return job
+
+    def _run(self, job, fn, model=None):
+        try:
+            self._run_job(job, fn)
+        finally:
+            if model is not None:
+                get_scheduler().release_admission(model)
+
+    def _run_job(self, job, fn):
+        if job.cancel_requested:
+            job._finish(CANCELLED)
+            return
+        job.status = RUNNING
+        job.started = time.time()
+        try:
+            with collect_spans() as spans, request_context(job.session_id, job.report_queue_position):
+                job.result = fn(job)
+            job.spans = spans
+            status = DONE
+        except JobCancelled:
+            status = CANCELLED
+        except SchedulerBusy as e:
+            logger.info("%s job %s turned away: %s", job.kind, job.id, e)
+            job.error = str(e)
+            status = FAILED
+        except Exception as e:
+            logger.exception("%s job %s failed", job.kind, job.id)
+            job.error = str(e)
+            status = FAILED
+        job._finish(status)
+
+    def get(self, job_id):
+        if job_id is None:
+            return None
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def forget(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _expire_finished(self):
+        # Caller holds self._lock
+        cutoff = time.time() - FINISHED_JOB_TTL_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.is_finished and job.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def submit_summary(self, text, method="extractive", top_n=2, scorer=None, session_id=None):
+        def run(job):
+            job.check_cancelled()
+            summary, from_cache = cached_summarize(text, method, top_n,
+                                                   progress_callback=job.report_progress,
+                                                   partial_callback=job.report_partial,
+                                                   scorer=scorer)
+            if not from_cache:
+                # A cached document has been counted already
+                learn_from(text)
+            return summary, from_cache
+        return self.submit("summary", run, {"method": method, "top_n": top_n, "chars": len(text),
+                                            "words": len(text.split())}, session_id,
+                           SUMMARIZATION_MODEL_KEY if method == "abstractive" else None)
+
+    def submit_corpus_summary(self, documents, method="extractive", top_n=5, session_id=None):
+        """Summarize (name, text) documents as one corpus; the result is (summary, dedup stats)."""
+        def run(job):
+            job.check_cancelled()
+            return summarize_corpus(documents, method, top_n,
+                                    progress_callback=job.report_progress,
+                                    partial_callback=job.report_partial)
+        return self.submit("corpus_summary", run, {
+            "method": method, "top_n": top_n, "documents": len(documents),
+            "chars": sum(len(text) for _, text in documents),
+            "words": sum(len(text.split()) for _, text in documents)}, session_id,
+            SUMMARIZATION_MODEL_KEY if method == "abstractive" else None)
+
+    def submit_translation(self, text, target_language="ta", session_id=None):
+        def run(job):
+            job.check_cancelled()
+            return translate_text(text, target_language)
+        return self.submit("translation", run, {"target_language": target_language, "chars": len(text)}, session_id,
+                           TRANSLATION_MODEL_KEY if TRANSLATION_BACKEND == "local" else None)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Return the process-wide job manager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
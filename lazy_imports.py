@@ -0,0 +1,86 @@
+import time
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Libraries that are only needed once a summary is requested
+HEAVY_MODULES = (
+    "numpy",
+    "scipy.sparse",
+    "sklearn.feature_extraction.text",
+    "transformers",
+)
+
+_import_lock = threading.RLock()
+_import_seconds = {}
+_preload_thread = None
+
+
+def import_module(name):
+    """Import a module once, recording how long the first import took."""
+    with _import_lock:
+        if name not in _import_seconds:
+            start = time.perf_counter()
+            module = importlib.import_module(name)
+            _import_seconds[name] = time.perf_counter() - start
+            logger.debug("Imported %s in %.3fs", name, _import_seconds[name])
+            return module
+    return importlib.import_module(name)
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def preload(modules=HEAVY_MODULES, background=True, on_done=None):
+    """
+    Import heavy modules ahead of first use, by default in a background thread so the
+    page that is being rendered is not held up. Only the first call starts a thread.
+    """
+    global _preload_thread
+
+    def _load_all():
+        for name in modules:
+            try:
+                import_module(name)
+            except ImportError:
+                logger.warning("Could not preload %s", name)
+        if on_done:
+            on_done()
+
+    if not background:
+        _load_all()
+        return None
+    with _import_lock:
+        if _preload_thread is None:
+            _preload_thread = threading.Thread(target=_load_all, name="preload-imports", daemon=True)
+            _preload_thread.start()
+    return _preload_thread
+
+
+def import_timings():
+    """Seconds spent on the first import of each module loaded through this layer."""
+    with _import_lock:
+        return dict(_import_seconds)
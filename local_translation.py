@@ -0,0 +1,148 @@
+"""
+Offline translation with a local seq2seq model, for nodes that cannot reach the Google endpoint.
+
+    TRANSLATE_BACKEND=local streamlit run app.py
+    TRANSLATE_BACKEND=local TRANSLATE_LOCAL_MODEL=Helsinki-NLP/opus-mt-en-fr ...   # a single-pair model
+
+The model is loaded once through the shared model registry (so TRANSLATE_LOCAL_BACKEND can
+be quantized or onnx like the summarizer) and its calls are queued by the inference scheduler.
+Text is translated sentence by sentence: sentences seen before come from a process-wide
+cache, and the rest are sorted by length and sent in batches so each batch pads little.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from model_registry import get_pipeline
+from inference_backends import resolve_backend
+from inference_scheduler import get_scheduler
+from text_processing import simple_sentence_tokenize
+from tracing import trace_stage
+
+# NLLB covers English to Tamil and 200 other languages in one model
+DEFAULT_LOCAL_MODEL = "facebook/nllb-200-distilled-600M"
+LOCAL_TRANSLATION_MODEL = os.environ.get("TRANSLATE_LOCAL_MODEL", DEFAULT_LOCAL_MODEL)
+# One of inference_backends.BACKENDS
+LOCAL_TRANSLATION_BACKEND = resolve_backend(os.environ.get("TRANSLATE_LOCAL_BACKEND", "pytorch"),
+                                            "TRANSLATE_LOCAL_BACKEND")
+TRANSLATION_BATCH_SIZE = int(os.environ.get("TRANSLATE_BATCH_SIZE", "16"))
+# Translated sentences kept per process, shared by every session
+SENTENCE_CACHE_ENTRIES = int(os.environ.get("TRANSLATE_CACHE_ENTRIES", "20000"))
+# Longer sentences are translated in word windows of this size, well inside the model's input limit
+MAX_SENTENCE_WORDS = 200
+MAX_OUTPUT_TOKENS = 512
+
+SOURCE_LANGUAGE = "en"
+# ISO 639-1 codes used by the app and the API, in NLLB's language_Script form
+NLLB_LANGUAGES = {
+    "en": "eng_Latn", "ta": "tam_Taml", "hi": "hin_Deva", "te": "tel_Telu", "ml": "mal_Mlym",
+    "kn": "kan_Knda", "bn": "ben_Beng", "mr": "mar_Deva", "gu": "guj_Gujr", "pa": "pan_Guru",
+    "ur": "urd_Arab", "si": "sin_Sinh", "fr": "fra_Latn", "de": "deu_Latn", "es": "spa_Latn",
+    "pt": "por_Latn", "it": "ita_Latn", "nl": "nld_Latn", "ru": "rus_Cyrl", "ar": "arb_Arab",
+    "zh": "zho_Hans", "ja": "jpn_Jpan", "ko": "kor_Hang", "id": "ind_Latn", "ms": "zsm_Latn",
+}
+
+
+class UnsupportedLanguage(ValueError):
+    pass
+
+
+def language_arguments(model_name, target_language):
+    """Source and target language arguments for multilingual models; single-pair models need none."""
+    name = model_name.lower()
+    if "nllb" in name:
+        if target_language not in NLLB_LANGUAGES:
+            raise UnsupportedLanguage(f"No NLLB code for target language {target_language!r}")
+        return {"src_lang": NLLB_LANGUAGES[SOURCE_LANGUAGE], "tgt_lang": NLLB_LANGUAGES[target_language]}
+    if "m2m100" in name:
+        return {"src_lang": SOURCE_LANGUAGE, "tgt_lang": target_language}
+    return {}
+
+
+class SentenceCache:
+    """Thread-safe LRU of (model, target language, sentence) -> translation."""
+
+    def __init__(self, max_entries=SENTENCE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get_many(self, keys):
+        """Cached translations for keys, as a dict holding only the hits."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = value
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(self._stats, entries=len(self._entries),
+                        hit_rate=self._stats["hits"] / lookups if lookups else 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+sentence_cache = SentenceCache()
+
+
+def _split_long(sentence, max_words=MAX_SENTENCE_WORDS):
+    words = sentence.split()
+    if len(words) <= max_words:
+        return [sentence]
+    return [' '.join(words[start:start + max_words]) for start in range(0, len(words), max_words)]
+
+
+def translate_sentences(sentences, target_language="ta", model_name=LOCAL_TRANSLATION_MODEL,
+                        backend=LOCAL_TRANSLATION_BACKEND, batch_size=TRANSLATION_BATCH_SIZE, cache=sentence_cache):
+    """Translate a list of sentences, returning the translations in the same order."""
+    language_kwargs = language_arguments(model_name, target_language)
+    keys = [(model_name, target_language, sentence) for sentence in sentences]
+    translations = cache.get_many(keys)
+    # Each distinct uncached sentence is translated once, however often it repeats
+    missing = list(dict.fromkeys(key[2] for key in keys if key not in translations))
+
+    if missing:
+        with trace_stage("model_load"):
+            translator = get_pipeline("translation", model_name, backend)
+        model_key = f"{model_name}:{backend}"
+        # Longest first, so each batch holds sentences of similar length and pads little;
+        # characters are a close enough proxy for tokens to order by
+        missing.sort(key=len, reverse=True)
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            with get_scheduler().slot(model_key), trace_stage("translate_inference", sum(map(len, batch))):
+                results = translator(batch, batch_size=len(batch), truncation=True,
+                                     max_length=MAX_OUTPUT_TOKENS, **language_kwargs)
+            batch_translations = [((model_name, target_language, sentence), result["translation_text"])
+                                  for sentence, result in zip(batch, results)]
+            cache.put_many(batch_translations)
+            translations.update(batch_translations)
+    return [translations[key] for key in keys]
+
+
+def translate_text_local(text, target_language="ta", **kwargs):
+    """Translate text sentence by sentence with the local model. Keyword arguments go to translate_sentences."""
+    sentences = [piece for sentence in simple_sentence_tokenize(text) for piece in _split_long(sentence)]
+    if not sentences:
+        return text
+    with trace_stage("translate_local", len(text)):
+        return ' '.join(translate_sentences(sentences, target_language, **kwargs))
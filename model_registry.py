@@ -0,0 +1,207 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from inference_backends import load_pipeline, resolve_backend
+from tracing import register_metrics
+
+logger = logging.getLogger(__name__)
+
+# BART distilled to 12 encoder and 6 decoder layers, fine-tuned on the same CNN/DailyMail data
+DISTILLED_SUMMARIZATION_MODEL = "sshleifer/distilbart-cnn-12-6"
+MODEL_ALIASES = {
+    "bart": "facebook/bart-large-cnn",
+    "distilled": DISTILLED_SUMMARIZATION_MODEL,
+}
+# A model alias or any summarization checkpoint name
+_model_setting = os.environ.get("SUMMARIZER_MODEL", "bart")
+SUMMARIZATION_MODEL = MODEL_ALIASES.get(_model_setting, _model_setting)
+# One of inference_backends.BACKENDS: pytorch, quantized or onnx
+SUMMARIZATION_BACKEND = resolve_backend(os.environ.get("SUMMARIZER_BACKEND", "pytorch"), "SUMMARIZER_BACKEND")
+
+# Limits for the process-wide cache of loaded pipelines
+MAX_LOADED_MODELS = int(os.environ.get("SUMMARIZER_MAX_MODELS", "2"))
+MAX_MODEL_MEMORY_BYTES = int(os.environ.get("SUMMARIZER_MAX_MODEL_MEMORY_MB", "4096")) * 1024 * 1024
+
+
+def _tensor_bytes(value, seen):
+    # Quantized Linear layers keep their int8 weights in (weight, bias) tuples of packed params
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(item, seen) for item in value)
+    if not hasattr(value, "element_size") or id(value) in seen:
+        return 0
+    seen.add(id(value))
+    return value.numel() * value.element_size()
+
+
+def estimate_pipeline_memory(pipe):
+    """Estimate the memory held by a pipeline from its model weights."""
+    model = getattr(pipe, "model", None)
+    if model is None:
+        return 0
+    state_dict = getattr(model, "state_dict", None)
+    if callable(state_dict):
+        # keep_vars returns the parameters themselves, so weights shared between layers count once
+        seen = set()
+        try:
+            return sum(_tensor_bytes(value, seen) for value in state_dict(keep_vars=True).values())
+        except TypeError:
+            pass
+    # ONNX Runtime models: the exported graphs hold the weights
+    save_dir = getattr(model, "model_save_dir", None)
+    if save_dir and os.path.isdir(save_dir):
+        return sum(os.path.getsize(os.path.join(save_dir, name)) for name in os.listdir(save_dir)
+                   if name.endswith((".onnx", ".onnx_data")))
+    # Other frameworks (e.g. TensorFlow) fall back to the parameter count if available
+    num_parameters = getattr(model, "num_parameters", None)
+    return num_parameters() * 4 if callable(num_parameters) else 0
+
+
+def _default_loader(task, model_name, backend):
+    return load_pipeline(task, model_name, backend)
+
+
+def _label(key):
+    task, model_name, backend = key
+    return f"{task}:{model_name}" if backend == "pytorch" else f"{task}:{model_name}:{backend}"
+
+
+class ModelRegistry:
+    """
+    Thread-safe LRU cache of loaded transformers pipelines shared by every session in the process.
+    Models are evicted when either the model count or the estimated memory limit is exceeded.
+    """
+
+    def __init__(self, max_models=MAX_LOADED_MODELS, max_memory_bytes=MAX_MODEL_MEMORY_BYTES,
+                 loader=_default_loader):
+        self.max_models = max_models
+        self.max_memory_bytes = max_memory_bytes
+        self._loader = loader
+        self._models = OrderedDict()  # (task, model_name, backend) -> (pipeline, size in bytes)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._warmup_thread = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "load_seconds": {},
+            "hit_seconds_total": 0.0,
+        }
+
+    def get(self, task, model_name, backend="pytorch"):
+        """Return a cached pipeline, loading it on first use."""
+        key = (task, model_name, backend)
+        start = time.perf_counter()
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["hit_seconds_total"] += time.perf_counter() - start
+                return self._models[key][0]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Only one thread loads a given model; others wait for it instead of loading a second copy
+        with load_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["hit_seconds_total"] += time.perf_counter() - start
+                    return self._models[key][0]
+                self._stats["misses"] += 1
+
+            load_start = time.perf_counter()
+            pipe = self._loader(task, model_name, backend)
+            load_seconds = time.perf_counter() - load_start
+            size = estimate_pipeline_memory(pipe)
+            logger.info("Loaded %s/%s (%s) in %.2fs (~%.0f MB)", task, model_name, backend, load_seconds, size / 1e6)
+
+            with self._lock:
+                self._models[key] = (pipe, size)
+                self._stats["load_seconds"][_label(key)] = load_seconds
+                self._evict()
+            return pipe
+
+    def _evict(self):
+        # Caller holds self._lock. The most recently used model is never evicted.
+        while len(self._models) > 1 and (
+            len(self._models) > self.max_models or self.memory_in_use() > self.max_memory_bytes
+        ):
+            key, _ = self._models.popitem(last=False)
+            self._stats["evictions"] += 1
+            logger.info("Evicted %s from model registry", _label(key))
+
+    def memory_in_use(self):
+        return sum(size for _, size in self._models.values())
+
+    def warm_up(self, models=(("summarization", SUMMARIZATION_MODEL, SUMMARIZATION_BACKEND),), background=True):
+        """Preload (task, model_name, backend) models so the first request does not pay the load cost."""
+        def _load_all():
+            for key in models:
+                try:
+                    self.get(*key)
+                except Exception:
+                    logger.exception("Failed to warm up %s", _label(key))
+
+        if not background:
+            _load_all()
+            return None
+        with self._lock:
+            if self._warmup_thread is None:
+                self._warmup_thread = threading.Thread(target=_load_all, name="model-warmup", daemon=True)
+                self._warmup_thread.start()
+        return self._warmup_thread
+
+    def stats(self):
+        """Return a snapshot of cache hits, misses, evictions and load timings."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "hits": self._stats["hits"],
+                "misses": self._stats["misses"],
+                "evictions": self._stats["evictions"],
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "avg_hit_seconds": (self._stats["hit_seconds_total"] / self._stats["hits"]
+                                    if self._stats["hits"] else 0.0),
+                "load_seconds": dict(self._stats["load_seconds"]),
+                "loaded_models": [_label(key) for key in self._models],
+                "memory_bytes": self.memory_in_use(),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+# Shared by every Streamlit session in this server process
+registry = ModelRegistry()
+
+
+def render_prometheus():
+    stats = registry.stats()
+    lines = []
+    for name, help_text, kind, value in (
+        ("summarizer_model_cache_hits_total", "Pipeline lookups served by an already loaded model.", "counter",
+         stats["hits"]),
+        ("summarizer_model_loads_total", "Pipelines loaded from disk.", "counter", stats["misses"]),
+        ("summarizer_model_evictions_total", "Pipelines evicted to stay within the model limits.", "counter",
+         stats["evictions"]),
+        ("summarizer_models_loaded", "Pipelines currently loaded.", "gauge", len(stats["loaded_models"])),
+        ("summarizer_model_memory_bytes", "Estimated memory held by loaded pipelines.", "gauge",
+         stats["memory_bytes"]),
+    ):
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"])
+    lines.extend(["# HELP summarizer_model_load_seconds Duration of the last load of each pipeline.",
+                  "# TYPE summarizer_model_load_seconds gauge"])
+    lines.extend(f'summarizer_model_load_seconds{{model="{model}"}} {seconds}'
+                 for model, seconds in sorted(stats["load_seconds"].items()))
+    return lines
+
+
+register_metrics(render_prometheus)
+
+
+def get_pipeline(task, model_name, backend="pytorch"):
+    return registry.get(task, model_name, backend)
@@ -0,0 +1,114 @@
+"""
+Query-focused extractive summaries.
+
+SentenceIndex is an inverted index over the sentences of one document, built once and
+kept in the session. Each query is answered with Okapi BM25 over the postings of the
+query terms only, and the best sentences are selected without sorting every score,
+so repeated queries on a large document cost milliseconds.
+"""
+import heapq
+import hashlib
+
+from lazy_imports import lazy_import
+from text_processing import sentence_spans
+from tracing import trace_stage
+
+np = lazy_import("numpy")
+sklearn_text = lazy_import("sklearn.feature_extraction.text")
+
+# Standard BM25 parameters: term-frequency saturation and sentence-length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def document_key(text):
+    """Identifies the document an index was built for, so a session can reuse it."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SentenceIndex:
+    """
+    BM25 index over a document's sentences.
+
+    Term frequencies are counted in one CountVectorizer pass and stored column-major, so
+    the postings of a term are one slice of a CSC matrix. The BM25 term-frequency factor
+    depends only on the sentence, so it is precomputed at build time and a query is a
+    sparse matrix-vector product over the columns of its terms.
+    """
+
+    def __init__(self, text, spans=None, k1=BM25_K1, b=BM25_B):
+        self.text = text
+        self.key = document_key(text)
+        self.spans = sentence_spans(text) if spans is None else spans
+        n = len(self.spans)
+        # Same tokenization, lowercasing and stop words as extractive scoring
+        self._vectorizer = sklearn_text.CountVectorizer(stop_words="english", dtype=np.float64)
+        with trace_stage("query_index_build", n):
+            try:
+                counts = self._vectorizer.fit_transform(text[start:end] for start, end in self.spans).tocsr()
+            except ValueError:
+                # No indexable terms: every query matches nothing
+                counts = None
+        self.vocabulary = {} if counts is None else self._vectorizer.vocabulary_
+        self._analyzer = self._vectorizer.build_analyzer()
+        if counts is None:
+            self._weights = None
+            self.idf = np.zeros(0)
+            return
+
+        lengths = np.asarray(counts.sum(axis=1)).ravel()
+        average_length = lengths.mean() or 1.0
+        # Saturated term frequency, tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average))
+        norms = k1 * (1 - b + b * lengths / average_length)
+        row_norms = np.repeat(norms, np.diff(counts.indptr))
+        counts.data = counts.data * (k1 + 1) / (counts.data + row_norms)
+        self._weights = counts.tocsc()
+
+        document_frequency = np.diff(self._weights.indptr)
+        # BM25 IDF, floored at zero so terms in most sentences never count against a match
+        self.idf = np.maximum(np.log((n - document_frequency + 0.5) / (document_frequency + 0.5) + 1.0), 0.0)
+
+    def __len__(self):
+        return len(self.spans)
+
+    def sentence(self, index):
+        start, end = self.spans[index]
+        return self.text[start:end]
+
+    def search(self, query, top_n=5):
+        """(index, score) pairs of the top_n sentences matching query, best first."""
+        columns = {}
+        for term in self._analyzer(query):
+            column = self.vocabulary.get(term)
+            if column is not None:
+                # A term repeated in the query counts once per repetition, as in BM25
+                columns[column] = columns.get(column, 0) + 1
+        if not columns:
+            return []
+        with trace_stage("query_search", len(self)):
+            terms = np.fromiter(columns, dtype=np.int64, count=len(columns))
+            repeats = np.fromiter(columns.values(), dtype=np.float64, count=len(columns))
+            scores = self._weights[:, terms] @ (self.idf[terms] * repeats)
+            candidates = np.flatnonzero(scores)
+            if len(candidates) > top_n:
+                # Common terms match most sentences: select in numpy, then order only the winners
+                candidates = candidates[np.argpartition(-scores[candidates], top_n)[:top_n]]
+            best = heapq.nlargest(top_n, candidates.tolist(), key=lambda index: (scores[index], -index))
+        return [(index, float(scores[index])) for index in best]
+
+    def summary(self, query, top_n=5):
+        """The top_n sentences most relevant to query, in document order."""
+        hits = self.search(query, top_n)
+        if not hits:
+            return ""
+        return " ".join(self.sentence(index) for index in sorted(index for index, _ in hits))
+
+
+def query_summary(text, query, top_n=5, index=None):
+    """
+    Query-focused summary of text. Pass the index returned by a previous call for the
+    same text to skip re-segmenting and re-indexing. Returns (summary, index).
+    """
+    if index is None or index.key != document_key(text):
+        index = SentenceIndex(text)
+    return index.summary(query, top_n), index
@@ -0,0 +1,96 @@
+from lazy_imports import lazy_import
+from tracing import trace_stage
+
+# Loaded on first use so the login page does not pay for them
+np = lazy_import("numpy")
+sparse = lazy_import("scipy.sparse")
+sklearn_text = lazy_import("sklearn.feature_extraction.text")
+
+# Rows of the similarity matrix computed at once when building the TextRank graph
+GRAPH_BLOCK_SIZE = 1024
+TEXTRANK_TOP_K = 10
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_MAX_ITER = 100
+TEXTRANK_TOL = 1.0e-6
+
+
+def centrality_scores(tfidf_matrix):
+    """
+    Sum of cosine similarities between each sentence and every other sentence.
+    TF-IDF rows are L2-normalised, so sum_j cos(i, j) = x_i . sum_j x_j, which is a
+    single sparse matrix-vector product instead of an N x N similarity matrix.
+    """
+    column_sums = np.asarray(tfidf_matrix.sum(axis=0)).ravel()
+    # Same "- 1" as the dense version: it removes the self-similarity of non-empty rows
+    return tfidf_matrix @ column_sums - 1.0
+
+
+def top_k_similarity_graph(tfidf_matrix, top_k=TEXTRANK_TOP_K, block_size=GRAPH_BLOCK_SIZE):
+    """Sparse similarity graph keeping only the top_k strongest neighbours of each sentence."""
+    n = tfidf_matrix.shape[0]
+    transposed = tfidf_matrix.T.tocsc()
+    rows, cols, weights = [], [], []
+    for start in range(0, n, block_size):
+        block = (tfidf_matrix[start:start + block_size] @ transposed).tocsr()
+        for offset in range(block.shape[0]):
+            row_start, row_end = block.indptr[offset], block.indptr[offset + 1]
+            neighbours = block.indices[row_start:row_end]
+            similarities = block.data[row_start:row_end]
+            keep = neighbours != start + offset
+            neighbours, similarities = neighbours[keep], similarities[keep]
+            if len(neighbours) > top_k:
+                best = np.argpartition(-similarities, top_k)[:top_k]
+                neighbours, similarities = neighbours[best], similarities[best]
+            rows.extend([start + offset] * len(neighbours))
+            cols.extend(neighbours)
+            weights.extend(similarities)
+    return sparse.csr_matrix((weights, (rows, cols)), shape=(n, n))
+
+
+def textrank_scores(tfidf_matrix, top_k=TEXTRANK_TOP_K, damping=TEXTRANK_DAMPING,
+                    max_iter=TEXTRANK_MAX_ITER, tol=TEXTRANK_TOL):
+    """PageRank over the sparse top-k sentence similarity graph."""
+    n = tfidf_matrix.shape[0]
+    graph = top_k_similarity_graph(tfidf_matrix, top_k)
+    out_weight = np.asarray(graph.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    transition_t = (sparse.diags(inverse) @ graph).T.tocsr()
+
+    ranks = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        # Sentences without neighbours spread their rank evenly over the graph
+        updated = damping * (transition_t @ ranks + ranks[dangling].sum() / n) + (1 - damping) / n
+        if np.abs(updated - ranks).sum() < tol:
+            ranks = updated
+            break
+        ranks = updated
+    return ranks
+
+
+def score_sentences(sentences, mode="centrality", top_k=TEXTRANK_TOP_K, n_sentences=None, idf_model=None):
+    """
+    Return (index, score) pairs for a single document.
+    sentences may be any iterable of strings (e.g. a generator of slices) when n_sentences is given.
+    With an idf_model (see idf_model.IdfModel), sentences are weighted by corpus-level IDF
+    instead of fitting IDF on the document itself.
+    """
+    if n_sentences is None:
+        n_sentences = len(sentences)
+    if n_sentences < 2:
+        return [(0, 1.0)]
+
+    if mode not in ("centrality", "textrank"):
+        raise ValueError(f"Unknown scoring mode: {mode}")
+    if idf_model is not None:
+        with trace_stage("tfidf_transform", n_sentences):
+            tfidf_matrix = idf_model.transform(sentences)
+    else:
+        with trace_stage("tfidf_fit", n_sentences):
+            tfidf_matrix = sklearn_text.TfidfVectorizer(stop_words="english").fit_transform(sentences)
+    with trace_stage(f"{mode}_scoring", n_sentences):
+        if mode == "centrality":
+            scores = centrality_scores(tfidf_matrix)
+        else:
+            scores = textrank_scores(tfidf_matrix, top_k)
+    return list(enumerate(scores.tolist()))
@@ -0,0 +1,301 @@
+"""
+Asyncio HTTP service exposing summarization and translation to other services.
+
+    python summarization_api.py --port 8080
+
+    POST /summarize  {"text": "...", "method": "extractive" | "abstractive", "top_n": 2}
+    POST /translate  {"text": "...", "target_language": "ta"}
+    GET  /stats      latency percentiles, batch sizes, inference queue depth and wait times,
+                     loaded models, the summary cache and the local translation sentence cache
+    GET  /metrics    per-stage histograms in Prometheus text format
+    GET  /health
+
+Concurrent abstractive requests are grouped into micro-batches for the BART pipeline.
+When the batch queue is full, requests are rejected with 503 and a Retry-After header.
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import model_registry
+from summarization_methods import abstractive_summary_batch
+from summary_cache import cached_summarize, get_cache
+from translation_service import translate_text, TranslationError
+from tracing import render_prometheus
+from inference_scheduler import get_scheduler, SchedulerBusy
+from local_translation import sentence_cache
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = int(os.environ.get("SUMMARIZER_API_MAX_BATCH", "8"))
+MAX_BATCH_WAIT_SECONDS = float(os.environ.get("SUMMARIZER_API_MAX_WAIT_MS", "20")) / 1000
+MAX_QUEUE_SIZE = int(os.environ.get("SUMMARIZER_API_MAX_QUEUE", "64"))
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = int(os.environ.get("SUMMARIZER_API_MAX_BODY_MB", "20")) * 1024 * 1024
+# Number of recent samples kept per endpoint for the latency percentiles
+LATENCY_WINDOW = 10000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class LatencyTracker:
+    """Sliding window of request latencies per endpoint."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = {}
+        self._counts = {}
+        self.window = window
+
+    def record(self, endpoint, seconds):
+        self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+        self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self):
+        report = {}
+        for endpoint, samples in self._samples.items():
+            ordered = sorted(samples)
+            report[endpoint] = {
+                "count": self._counts[endpoint],
+                "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 2),
+                "p95_ms": round(self._percentile(ordered, 0.95) * 1000, 2),
+                "p99_ms": round(self._percentile(ordered, 0.99) * 1000, 2),
+            }
+        return report
+
+
+class MicroBatcher:
+    """
+    Collects concurrent abstractive requests and runs them through the model together.
+    A batch is dispatched when it reaches max_batch_size or when the oldest request has
+    waited max_wait seconds, whichever comes first.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_BATCH_WAIT_SECONDS,
+                 max_queue_size=MAX_QUEUE_SIZE, executor=None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        # One model call at a time; the model itself uses every core
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="batcher")
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, text):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((text, future))
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Summarization queue is full ({self.queue.maxsize} requests)")
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests whose client has gone away are dropped before inference
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+            self.batch_sizes.append(len(batch))
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        sizes = list(self.batch_sizes)
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_size": self.queue.maxsize,
+            "batches": len(sizes),
+            "avg_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+        }
+
+
+class SummarizationService:
+    def __init__(self, batch_fn=abstractive_summary_batch, max_batch_size=MAX_BATCH_SIZE,
+                 max_wait=MAX_BATCH_WAIT_SECONDS, max_queue_size=MAX_QUEUE_SIZE):
+        self.batcher = MicroBatcher(batch_fn, max_batch_size, max_wait, max_queue_size)
+        self.latency = LatencyTracker()
+        # Extractive summaries and translations run off the event loop
+        self.executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="api")
+
+    async def handle(self, method, path, body):
+        """Route a request. Returns (status, payload, extra headers)."""
+        if path == "/health":
+            return 200, {"status": "ok"}, {}
+        if path == "/metrics":
+            return 200, render_prometheus(), {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        if path == "/stats":
+            return 200, {"latency": self.latency.summary(), "batching": self.batcher.stats(),
+                         "scheduler": get_scheduler().stats(), "models": model_registry.registry.stats(),
+                         "summary_cache": get_cache().stats(),
+                         "translation_cache": sentence_cache.stats()}, {}
+        if path not in ("/summarize", "/translate"):
+            return 404, {"error": f"Unknown path: {path}"}, {}
+        if method != "POST":
+            return 405, {"error": "Use POST"}, {}
+
+        try:
+            request = json.loads(body or b"{}")
+            text = request["text"]
+            if not isinstance(text, str):
+                raise TypeError("text must be a string")
+            top_n = int(request.get("top_n", 2))
+            if top_n < 1:
+                raise ValueError("top_n must be at least 1")
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"Invalid request: {e}"}, {}
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            if path == "/translate":
+                target_language = request.get("target_language", "ta")
+                result = await loop.run_in_executor(self.executor, translate_text, text, target_language)
+                payload = {"translation": result}
+            elif request.get("method", "extractive") == "abstractive":
+                if not text.strip():
+                    payload = {"summary": "No text to summarize."}
+                else:
+                    payload = {"summary": await self.batcher.submit(text)}
+            else:
+                # Shared with the dashboard, so a document summarized there or by another client is not redone
+                summary, from_cache = await loop.run_in_executor(self.executor, cached_summarize, text,
+                                                                 "extractive", top_n)
+                payload = {"summary": summary, "cached": from_cache}
+        except QueueFullError as e:
+            return 503, {"error": str(e), "queue_depth": self.batcher.queue.qsize()}, {"Retry-After": "1"}
+        except SchedulerBusy as e:
+            return 503, {"error": str(e), "queue_position": e.position}, {"Retry-After": "1"}
+        except TranslationError as e:
+            logger.warning("Translation failed: %s", e)
+            return 502, {"error": str(e)}, {}
+        except Exception as e:
+            logger.exception("Request to %s failed", path)
+            return 500, {"error": str(e)}, {}
+        self.latency.record(path if path == "/translate" else f"{path}:{request.get('method', 'extractive')}",
+                            time.perf_counter() - start)
+        return 200, payload, {}
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive and Content-Length bodies."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, {}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, {}, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, {}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1")
+
+                status, payload, extra = await self.handle(method.upper(), target.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, extra_headers, keep_alive):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **extra_headers,
+        }
+        head = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        logger.info("Listening on %s:%d", host, port)
+        return server
+
+
+async def _main(host, port):
+    service = SummarizationService()
+    server = await service.serve(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP summarization and translation API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
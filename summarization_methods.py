@@ -1,27 +1,160 @@
-import streamlit as st
-from transformers import pipeline
-from text_processing import simple_sentence_tokenize, get_sentence_scores, get_summary
-
-def abstractive_summary(text):
-    # Handle texts that might be too long for the model
-    max_chars = 1024 * 3  # Approximate character limit
-    if len(text) > max_chars:
-        text = text[:max_chars]
-        st.warning("Text was truncated to fit within model limits.")
-    
-    summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-    summary = summarizer(text, max_length=150, min_length=50, do_sample=False)
+import os
+from model_registry import get_pipeline, SUMMARIZATION_MODEL, SUMMARIZATION_BACKEND
+from text_processing import simple_sentence_tokenize, sentence_spans, get_span_scores, get_summary_from_spans, chunk_sentences
+from tracing import trace_stage
+from inference_scheduler import get_scheduler
+from idf_model import get_idf_model
+
+# Number of chunks sent to the model in one forward pass
+ABSTRACTIVE_BATCH_SIZE = int(os.environ.get("SUMMARIZER_BATCH_SIZE", "4"))
+# Upper bound for the encoder input; BART is trained on 1024 positions
+MAX_INPUT_TOKENS = 1024
+# Leave room for the special tokens the tokenizer adds around each chunk
+TOKEN_MARGIN = 16
+# Optional truncation of uploads, off by default (0): characters read per key sentence of an
+# extractive summary, and for an abstractive one. Text past the limit is not summarized.
+EXTRACTIVE_CHARS_PER_SENTENCE = int(os.environ.get("SUMMARIZER_EXTRACTIVE_CHARS_PER_SENTENCE", "0"))
+ABSTRACTIVE_MAX_INPUT_CHARS = int(os.environ.get("SUMMARIZER_ABSTRACTIVE_MAX_CHARS", "0"))
+
+def input_char_limit(method, top_n=2):
+    """
+    The configured truncation limit for uploads summarized with method, or None to read them whole.
+    Query-focused summaries search the whole document, so they are never truncated.
+    """
+    if method == "extractive" and EXTRACTIVE_CHARS_PER_SENTENCE:
+        return EXTRACTIVE_CHARS_PER_SENTENCE * max(1, top_n)
+    if method == "abstractive" and ABSTRACTIVE_MAX_INPUT_CHARS:
+        return ABSTRACTIVE_MAX_INPUT_CHARS
+    return None
+
+def _max_chunk_tokens(summarizer):
+    model_max = getattr(summarizer.tokenizer, "model_max_length", MAX_INPUT_TOKENS)
+    return min(model_max, MAX_INPUT_TOKENS) - TOKEN_MARGIN
+
+def _token_counts(summarizer, sentences):
+    encoded = summarizer.tokenizer(sentences, add_special_tokens=False)["input_ids"]
+    return [len(ids) for ids in encoded]
+
+def _run_model(summarizer, model_key, inputs, input_tokens, **generate_kwargs):
+    """One model call, queued fairly behind calls to the same model from other sessions."""
+    with get_scheduler().slot(model_key), trace_stage("abstractive_inference", input_tokens):
+        return summarizer(inputs, do_sample=False, truncation=True, **generate_kwargs)
+
+def _chunk_length_limits(tokens, max_length, min_length):
+    """(max_length, min_length) for one chunk: the requested limits, reduced only for chunks too short for them."""
+    chunk_min_length = max(1, min(min_length, tokens // 2))
+    chunk_max_length = max(chunk_min_length + 1, min(max_length, tokens))
+    return chunk_max_length, chunk_min_length
+
+def _summarize_chunks(summarizer, model_key, chunks, token_counts, max_length, min_length, batch_size,
+                      on_batch=None):
+    """
+    Map step: summarize each chunk, batch_size chunks per model call.
+    Length limits are per model call, so only chunks with the same limits share a batch:
+    a short tail chunk is summarized on its own instead of capping the full chunks.
+    """
+    limits = [_chunk_length_limits(tokens, max_length, min_length) for tokens in token_counts]
+    # Chunks with equal limits are batched together, in document order within each group
+    order = sorted(range(len(chunks)), key=lambda i: (limits[i] != limits[0], limits[i], i))
+    summaries = [None] * len(chunks)
+    start = 0
+    while start < len(order):
+        batch = [order[start]]
+        while (len(batch) < batch_size and start + len(batch) < len(order)
+               and limits[order[start + len(batch)]] == limits[batch[0]]):
+            batch.append(order[start + len(batch)])
+        start += len(batch)
+        batch_max_length, batch_min_length = limits[batch[0]]
+        results = _run_model(summarizer, model_key, [chunks[i] for i in batch], sum(token_counts[i] for i in batch),
+                             max_length=batch_max_length, min_length=batch_min_length, batch_size=len(batch))
+        for i, result in zip(batch, results):
+            summaries[i] = result['summary_text']
+        if on_batch:
+            on_batch([summary for summary in summaries if summary is not None])
+    return summaries
+
+def abstractive_summary(text, max_length=150, min_length=50, batch_size=ABSTRACTIVE_BATCH_SIZE,
+                        progress_callback=None, model_name=SUMMARIZATION_MODEL, partial_callback=None,
+                        backend=SUMMARIZATION_BACKEND):
+    """
+    Summarize text of any length with map-reduce over sentence-aligned chunks.
+    Chunks are summarized in batches, then the partial summaries are reduced in
+    further rounds until they fit into a single model input.
+    progress_callback(done, total, stage) is called after every batch, and
+    partial_callback(summaries) with the chunk summaries of the first round so far.
+    """
+    # Loaded once per process and shared across sessions
+    with trace_stage("model_load"):
+        summarizer = get_pipeline("summarization", model_name, backend)
+    model_key = f"{model_name}:{backend}"
+    max_tokens = _max_chunk_tokens(summarizer)
+
+    sentences = simple_sentence_tokenize(text)
+    stage = 0
+    while True:
+        token_counts = _token_counts(summarizer, sentences)
+        if sum(token_counts) <= max_tokens:
+            break
+        chunks = chunk_sentences(sentences, token_counts, max_tokens)
+        chunk_tokens = _token_counts(summarizer, chunks)
+        stage += 1
+
+        def on_batch(partial_summaries, total=len(chunks), stage=stage):
+            if progress_callback:
+                progress_callback(len(partial_summaries), total, stage)
+            if partial_callback and stage == 1:
+                partial_callback(list(partial_summaries))
+
+        partial_summaries = _summarize_chunks(summarizer, model_key, chunks, chunk_tokens, max_length, min_length,
+                                              batch_size, on_batch)
+        # Re-segment the partial summaries so the next round chunks on sentence boundaries again
+        sentences = simple_sentence_tokenize(' '.join(partial_summaries))
+
+    # Final pass over input that now fits the model
+    text = ' '.join(sentences)
+    summary = _run_model(summarizer, model_key, text, sum(token_counts), max_length=max_length, min_length=min_length)
+    if progress_callback:
+        progress_callback(1, 1, stage + 1)
     return summary[0]['summary_text']
 
-def summarize(text, method="extractive", top_n=2):
+def abstractive_summary_batch(texts, max_length=150, min_length=50, batch_size=ABSTRACTIVE_BATCH_SIZE):
+    """
+    Summarize several independent texts, sharing model calls between them.
+    Texts that fit in a single model input are summarized together in batches;
+    longer ones go through the chunked map-reduce path one at a time.
+    """
+    summarizer = get_pipeline("summarization", SUMMARIZATION_MODEL, SUMMARIZATION_BACKEND)
+    max_tokens = _max_chunk_tokens(summarizer)
+    token_counts = _token_counts(summarizer, texts)
+
+    summaries = [None] * len(texts)
+    short = [i for i, n in enumerate(token_counts) if n <= max_tokens]
+    for i in range(len(texts)):
+        if token_counts[i] > max_tokens:
+            summaries[i] = abstractive_summary(texts[i], max_length, min_length, batch_size)
+    if short:
+        results = _run_model(summarizer, f"{SUMMARIZATION_MODEL}:{SUMMARIZATION_BACKEND}", [texts[i] for i in short],
+                             sum(token_counts[i] for i in short),
+                             max_length=max_length, min_length=min_length, batch_size=batch_size)
+        for i, result in zip(short, results):
+            summaries[i] = result['summary_text']
+    return summaries
+
+def summarize(text, method="extractive", top_n=2, progress_callback=None, partial_callback=None, scorer=None):
+    """
+    scorer: optional IncrementalScorer that reuses the term counts of sentences it has seen before.
+    It is not used when a corpus IDF model is configured, which needs no per-document fit.
+    """
     if not text.strip():
         return "No text to summarize."
-    
-    # Use our custom tokenizer instead of NLTK
-    sentences = simple_sentence_tokenize(text)
-    
+
     if method == "extractive":
-        sentence_scores = get_sentence_scores(sentences)
-        return get_summary(sentences, sentence_scores, top_n)
+        # Work on sentence offsets so large documents are not copied sentence by sentence
+        spans = sentence_spans(text)
+        if scorer is not None and get_idf_model() is None:
+            sentence_scores = scorer.score_spans(text, spans)
+        else:
+            sentence_scores = get_span_scores(text, spans)
+        return get_summary_from_spans(text, spans, sentence_scores, top_n)
     elif method == "abstractive":
-        return abstractive_summary(text)
\ No newline at end of file
+        return abstractive_summary(text, progress_callback=progress_callback, partial_callback=partial_callback)
\ No newline at end of file
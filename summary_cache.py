@@ -0,0 +1,194 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+from model_registry import SUMMARIZATION_MODEL, SUMMARIZATION_BACKEND
+from summarization_methods import summarize
+from idf_model import get_idf_model
+from tracing import trace_stage, register_metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get("SUMMARIZER_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "text-summarizer"))
+MAX_MEMORY_ENTRIES = int(os.environ.get("SUMMARIZER_CACHE_MEMORY_ENTRIES", "256"))
+MAX_DISK_BYTES = int(os.environ.get("SUMMARIZER_CACHE_DISK_MB", "256")) * 1024 * 1024
+
+# Bump when extractive scoring changes so stale summaries are not served
+EXTRACTIVE_VERSION = "tfidf-centrality-1"
+
+
+def normalize_text(text):
+    """Collapse whitespace so the same document pasted or uploaded hashes identically."""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def model_version(method):
+    if method != "abstractive":
+        # Scores depend on the corpus statistics, which change as the IDF model is updated
+        idf_model = get_idf_model()
+        return EXTRACTIVE_VERSION if idf_model is None else f"{EXTRACTIVE_VERSION}:{idf_model.fingerprint}"
+    # Quantized and ONNX backends produce slightly different summaries from the same model
+    return SUMMARIZATION_MODEL if SUMMARIZATION_BACKEND == "pytorch" else f"{SUMMARIZATION_MODEL}:{SUMMARIZATION_BACKEND}"
+
+
+def cache_key(text, method, top_n):
+    digest = hashlib.sha256()
+    for part in (normalize_text(text), method, str(top_n), model_version(method)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SummaryCache:
+    """
+    Two-tier summary cache shared by every session in the process: an in-memory LRU in
+    front of a directory of JSON files that is trimmed oldest-first when it grows past max_disk_bytes.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_memory_entries=MAX_MEMORY_ENTRIES, max_disk_bytes=MAX_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bytes_saved": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached entry dict for key, or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                self._stats["bytes_saved"] += entry["input_bytes"]
+                return entry
+
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            # Refresh the modification time so disk eviction is least-recently-used
+            os.utime(self._path(key))
+        except (OSError, ValueError):
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self._stats["disk_hits"] += 1
+            self._stats["bytes_saved"] += entry["input_bytes"]
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key, summary, input_bytes):
+        entry = {"summary": summary, "input_bytes": input_bytes}
+        with self._lock:
+            self._remember(key, entry)
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(key))
+        self._trim_disk()
+
+    def _remember(self, key, entry):
+        # Caller holds self._lock
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _trim_disk(self):
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, name))
+            total += stat.st_size
+        if total <= self.max_disk_bytes:
+            return
+        for _, size, name in sorted(files):
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SummaryCache()
+        return _cache
+
+
+def render_prometheus():
+    stats = get_cache().stats()
+    lines = ["# HELP summarizer_summary_cache_hits_total Summaries served from the cache.",
+             "# TYPE summarizer_summary_cache_hits_total counter",
+             f'summarizer_summary_cache_hits_total{{tier="memory"}} {stats["memory_hits"]}',
+             f'summarizer_summary_cache_hits_total{{tier="disk"}} {stats["disk_hits"]}']
+    for name, help_text, kind, field in (
+        ("summarizer_summary_cache_misses_total", "Summaries not found in the cache.", "counter", "misses"),
+        ("summarizer_summary_cache_saved_bytes_total", "Input bytes not summarized again thanks to the cache.",
+         "counter", "bytes_saved"),
+        ("summarizer_summary_cache_memory_entries", "Summaries held in the in-memory tier.", "gauge",
+         "memory_entries"),
+    ):
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {stats[field]}"])
+    return lines
+
+
+register_metrics(render_prometheus)
+
+
+def cached_summarize(text, method="extractive", top_n=2, progress_callback=None, partial_callback=None,
+                     scorer=None):
+    """
+    summarize() backed by the shared cache.
+    Returns (summary, from_cache).
+    """
+    cache = get_cache()
+    with trace_stage("cache_lookup", len(text)):
+        key = cache_key(text, method, top_n)
+        entry = cache.get(key)
+    if entry is not None:
+        return entry["summary"], True
+
+    summary = summarize(text, method, top_n, progress_callback=progress_callback, partial_callback=partial_callback,
+                        scorer=scorer)
+    try:
+        cache.put(key, summary, len(text.encode("utf-8")))
+    except OSError:
+        logger.exception("Could not write summary to cache")
+    return summary, False
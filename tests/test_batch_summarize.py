@@ -0,0 +1,25 @@
+import json
+
+from batch_summarize import completed_paths, run_batch
+
+
+def test_resume_after_a_record_cut_off_mid_character(tmp_path):
+    paths = []
+    for name in ("a", "b"):
+        path = tmp_path / f"{name}.txt"
+        path.write_text("Le cyclone approche de la côte. Les écoles sont fermées. Les trains sont annulés.",
+                        encoding="utf-8")
+        paths.append(str(path))
+    output = tmp_path / "summaries.jsonl"
+    complete = json.dumps({"path": paths[0], "summary": "Les écoles sont fermées."}, ensure_ascii=False)
+    cut_off = json.dumps({"path": paths[1], "summary": "Les écoles"}, ensure_ascii=False).encode("utf-8")
+    # Killed after the first byte of "é"
+    output.write_bytes((complete + "\n").encode("utf-8") + cut_off[:cut_off.index("é".encode("utf-8")) + 1])
+
+    assert completed_paths(str(output)) == {paths[0]}
+
+    stats = run_batch(paths, str(output), workers=1)
+    assert stats["processed"] == 1 and stats["skipped"] == 1
+    assert completed_paths(str(output)) == set(paths)
+    last = output.read_bytes().splitlines()[-1]
+    assert json.loads(last.decode("ascii"))["path"] == paths[1]
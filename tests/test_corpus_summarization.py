@@ -0,0 +1,63 @@
+import os
+import json
+import subprocess
+import sys
+
+from corpus_summarization import deduplicate_sentences, summarize_corpus
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARAGRAPH = [
+    "A severe cyclone is expected to make landfall on the eastern coast tomorrow evening with heavy rain.",
+    "Fishermen have been warned not to venture into the sea until the storm has passed the coastal districts.",
+    "Relief camps have been opened and thousands of residents were moved to safety by the district officials.",
+]
+# The same paragraph as reported by another outlet: punctuation, case and one word changed
+REWORDED = [
+    "A severe cyclone is expected to make landfall on the eastern coast tomorrow evening, with heavy rain!",
+    "FISHERMEN have been warned not to venture into the sea until the storm has passed the coastal districts.",
+    "Relief camps have been opened and thousands of residents were moved to safety by the district authorities.",
+]
+DISTINCT = [
+    "Train services along the coast have been cancelled as a precaution for the next two days.",
+    "Schools and colleges in the affected districts will remain closed until further notice.",
+    "The weather department said wind speeds could reach one hundred and fifty kilometres per hour.",
+]
+
+
+def test_near_identical_sentences_are_collapsed():
+    kept = deduplicate_sentences(PARAGRAPH + REWORDED)
+    assert kept == [0, 1, 2]
+
+
+def test_distinct_sentences_are_kept():
+    sentences = PARAGRAPH + DISTINCT
+    assert deduplicate_sentences(sentences) == list(range(len(sentences)))
+
+
+def test_threshold_controls_what_counts_as_a_duplicate():
+    sentences = PARAGRAPH + REWORDED
+    # Repeats that differ only in case and punctuation go at any threshold; the sentence with
+    # a changed word is only a duplicate below full agreement
+    assert deduplicate_sentences(sentences, threshold=1.0) == [0, 1, 2, 5]
+    assert deduplicate_sentences(sentences, threshold=0.5) == [0, 1, 2]
+
+
+def test_corpus_summary_reports_removed_duplicates():
+    documents = [("first.txt", " ".join(PARAGRAPH + DISTINCT)), ("second.txt", " ".join(REWORDED))]
+    summary, stats = summarize_corpus(documents, top_n=2)
+    assert summary
+    assert stats["sentences"] == 9
+    assert stats["duplicates_removed"] == 3
+
+
+def test_deduplication_is_the_same_in_every_process():
+    script = ("import sys, json; from corpus_summarization import deduplicate_sentences; "
+              "print(deduplicate_sentences(json.load(sys.stdin), threshold=0.95))")
+    sentences = PARAGRAPH + REWORDED + DISTINCT
+    results = set()
+    for seed in ("1", "2", "3"):
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True,
+                                input=json.dumps(sentences), env=dict(os.environ, PYTHONHASHSEED=seed))
+        results.add(result.stdout)
+    assert len(results) == 1
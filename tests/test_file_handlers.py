@@ -0,0 +1,35 @@
+import io
+import os
+import signal
+
+import pytest
+
+import file_handlers
+from benchmarks.corpus import make_pdf, make_text
+
+pytest.importorskip("PyPDF2")
+
+
+def _pdf(pages):
+    # 45 lines of 90 characters fill one page
+    return make_pdf(make_text(pages * 45 * 90, seed=3))
+
+
+def test_broken_pdf_pool_is_replaced(monkeypatch):
+    monkeypatch.setattr(file_handlers, "PARALLEL_PAGE_THRESHOLD", 2)
+    data = _pdf(8)
+    expected = list(file_handlers.iter_pdf_pages(io.BytesIO(data), workers=1))
+    assert len(expected) >= 8
+
+    assert list(file_handlers.iter_pdf_pages(io.BytesIO(data), workers=2)) == expected
+    executor = file_handlers._pdf_executors[2]
+    # A worker dying (out of memory, a crash in the PDF parser) breaks the whole pool
+    for process in list(executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+    assert list(file_handlers.iter_pdf_pages(io.BytesIO(data), workers=2)) == expected
+    assert file_handlers._pdf_executors.get(2) is not executor
+    # The next upload gets a working pool again
+    assert list(file_handlers.iter_pdf_pages(io.BytesIO(data), workers=2)) == expected
+    assert 2 in file_handlers._pdf_executors
@@ -0,0 +1,30 @@
+import idf_model
+from idf_model import IdfModel
+
+
+def _learn(model, text):
+    future = model.update_in_background([text])
+    if future is not None:
+        future.result()
+
+
+def test_background_updates_are_batched_and_deduplicated(monkeypatch, tmp_path):
+    monkeypatch.setattr(idf_model, "UPDATE_BATCH_DOCUMENTS", 3)
+    model = IdfModel.build(["cyclone warning for the coast", "rivers rose overnight"], n_features=2 ** 12)
+    model.save(str(tmp_path))
+    fingerprint = model.fingerprint
+
+    for text in ["relief camps opened", "relief camps opened", "schools closed for two days"]:
+        _learn(model, text)
+    # Two distinct documents are pending; scoring statistics and cache keys are unchanged
+    assert model.n_documents == 2
+    assert model.fingerprint == fingerprint
+
+    _learn(model, "trains cancelled along the coast")
+    assert model.n_documents == 5
+    assert model.fingerprint != fingerprint
+    assert IdfModel.load(str(tmp_path)).fingerprint == model.fingerprint
+
+    _learn(model, "relief camps opened")
+    _learn(model, "relief camps opened")
+    assert model._pending_documents == 0
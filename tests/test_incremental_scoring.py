@@ -0,0 +1,50 @@
+import numpy as np
+
+from incremental_scoring import IncrementalScorer
+from sentence_scoring import score_sentences
+
+ORIGINAL = [
+    "A severe cyclone is expected to make landfall on the eastern coast tomorrow evening.",
+    "Fishermen have been warned not to venture into the sea until the cyclone passes.",
+    "The weather department said wind speeds could reach 150 kilometres per hour.",
+    "Schools in the coastal districts will remain closed for two days.",
+    "Relief camps have been opened and thousands of residents were moved to safety.",
+    "The cyclone has already caused heavy rain in several coastal districts.",
+    "Officials said power supply may be disrupted in low-lying areas.",
+]
+
+# One sentence edited, one removed, one added and one repeated
+EDITED = [
+    ORIGINAL[0],
+    "Fishermen have been told to return to harbour before the cyclone arrives.",
+    ORIGINAL[2],
+    ORIGINAL[4],
+    ORIGINAL[5],
+    "Train services along the coast have been cancelled as a precaution.",
+    ORIGINAL[6],
+    ORIGINAL[0],
+]
+
+
+def scores(pairs):
+    return [score for _, score in pairs]
+
+
+def test_rescoring_an_edit_matches_full_recompute():
+    scorer = IncrementalScorer()
+    np.testing.assert_allclose(scores(scorer.score(ORIGINAL)), scores(score_sentences(ORIGINAL)), atol=1e-9)
+
+    np.testing.assert_allclose(scores(scorer.score(EDITED)), scores(score_sentences(EDITED)), atol=1e-9)
+    assert scorer.last_update == {"sentences": len(EDITED), "analysed": 2, "reused": len(EDITED) - 2}
+
+
+def test_rescoring_spans_matches_full_recompute():
+    text = " ".join(EDITED)
+    spans = []
+    start = 0
+    for sentence in EDITED:
+        spans.append((start, start + len(sentence)))
+        start += len(sentence) + 1
+    scorer = IncrementalScorer()
+    scorer.score(ORIGINAL)
+    np.testing.assert_allclose(scores(scorer.score_spans(text, spans)), scores(score_sentences(EDITED)), atol=1e-9)
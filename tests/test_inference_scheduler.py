@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+import inference_scheduler
+from inference_scheduler import InferenceScheduler, SchedulerBusy, request_context
+
+MODEL = "model"
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(inference_scheduler, "POLL_SECONDS", 0.01)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+class Calls:
+    """Model calls made from threads, each attributed to a session."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.served = []
+        self.positions = {}
+        self.errors = []
+        self.threads = []
+        self._lock = threading.Lock()
+
+    def start(self, session, name, hold=None):
+        def on_wait(position):
+            if position is not None:
+                self.positions[name] = position
+
+        def call():
+            try:
+                with request_context(session, on_wait), self.scheduler.slot(MODEL):
+                    with self._lock:
+                        self.served.append(name)
+                    if hold is not None:
+                        hold.wait(5)
+            except SchedulerBusy as e:
+                self.errors.append(e)
+
+        queued = self.scheduler.stats().get(MODEL, {}).get("queue_depth", 0)
+        thread = threading.Thread(target=call, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+        return queued
+
+    def start_queued(self, session, name):
+        """Start a call and wait until it is in the queue, so calls queue in a known order."""
+        queued = self.start(session, name)
+        wait_until(lambda: self.scheduler.stats()[MODEL]["queue_depth"] == queued + 1)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join(5)
+
+
+def test_sessions_are_served_round_robin_with_positions():
+    scheduler = InferenceScheduler(concurrency=1, max_queued=10)
+    calls = Calls(scheduler)
+    release = threading.Event()
+    calls.start("blocker", "blocker", hold=release)
+    wait_until(lambda: calls.served == ["blocker"])
+
+    # One session submits four chunks before two sessions submit one each
+    for chunk in range(1, 5):
+        calls.start_queued("long", f"long-{chunk}")
+    calls.start_queued("short-a", "short-a")
+    calls.start_queued("short-b", "short-b")
+
+    expected = ["long-1", "short-a", "short-b", "long-2", "long-3", "long-4"]
+    wait_until(lambda: calls.positions == {name: position for position, name in enumerate(expected, start=1)})
+
+    release.set()
+    calls.join()
+    assert calls.served == ["blocker"] + expected
+    assert scheduler.stats()[MODEL]["served"] == 7
+
+
+def test_full_queue_rejects_new_calls():
+    scheduler = InferenceScheduler(concurrency=1, max_queued=2)
+    calls = Calls(scheduler)
+    release = threading.Event()
+    calls.start("a", "running", hold=release)
+    wait_until(lambda: calls.served == ["running"])
+    calls.start_queued("b", "waiting-1")
+    calls.start_queued("c", "waiting-2")
+
+    with pytest.raises(SchedulerBusy) as busy:
+        with scheduler.slot(MODEL):
+            pass
+    assert busy.value.position == 3
+    assert scheduler.stats()[MODEL]["rejected"] == 1
+
+    release.set()
+    calls.join()
+    assert calls.served == ["running", "waiting-1", "waiting-2"]
+    assert calls.errors == []
+
+
+def test_admission_is_limited_to_slots_plus_queue():
+    scheduler = InferenceScheduler(concurrency=1, max_queued=2)
+    for _ in range(3):
+        scheduler.admit(MODEL)
+    with pytest.raises(SchedulerBusy) as busy:
+        scheduler.admit(MODEL)
+    assert busy.value.position == 3
+    assert scheduler.stats()[MODEL]["admitted_jobs"] == 3
+    assert scheduler.stats()[MODEL]["rejected"] == 1
+
+    scheduler.release_admission(MODEL)
+    scheduler.admit(MODEL)
+    assert scheduler.stats()[MODEL]["admitted_jobs"] == 3
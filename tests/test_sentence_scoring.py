@@ -0,0 +1,42 @@
+import heapq
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from sentence_scoring import score_sentences
+
+SENTENCES = [
+    "A severe cyclone is expected to make landfall on the eastern coast tomorrow evening.",
+    "Fishermen have been warned not to venture into the sea until the cyclone passes.",
+    "The weather department said wind speeds could reach 150 kilometres per hour.",
+    "Schools in the coastal districts will remain closed for two days.",
+    "Relief camps have been opened and thousands of residents were moved to safety.",
+    "The cyclone has already caused heavy rain in several coastal districts.",
+    "Officials said power supply may be disrupted in low-lying areas.",
+    "Train services along the coast have been cancelled as a precaution.",
+    "Disaster response teams are stationed in the districts most at risk from the cyclone.",
+    "Residents were asked to stock up on food, water and medicines.",
+    "The local football match has been postponed.",
+    "Heavy rain and strong wind are expected to continue through the weekend.",
+]
+
+
+def dense_scores(sentences):
+    """The original computation: row sums of the full N x N cosine similarity matrix, minus self-similarity."""
+    tfidf_matrix = TfidfVectorizer(stop_words="english").fit_transform(sentences)
+    cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
+    return [(idx, sum(cosine_sim[idx]) - 1) for idx in range(len(sentences))]
+
+
+def top_indices(scores, top_n):
+    return sorted(idx for idx, _ in heapq.nlargest(top_n, scores, key=lambda x: x[1]))
+
+
+def test_centrality_matches_dense_similarity_matrix():
+    sparse_scores = score_sentences(SENTENCES)
+    expected = dense_scores(SENTENCES)
+    np.testing.assert_allclose([score for _, score in sparse_scores], [score for _, score in expected],
+                               atol=1e-9)
+    for top_n in (1, 2, 3, 5):
+        assert top_indices(sparse_scores, top_n) == top_indices(expected, top_n)
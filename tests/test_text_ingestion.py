@@ -0,0 +1,73 @@
+import io
+import codecs
+
+import pytest
+
+import text_ingestion
+from text_ingestion import detect_encoding, read_text, iter_text_blocks, UploadTooLarge
+
+TEXT = "Cyclone warning: café closures expected — stay indoors. 气旋预计明天登陆.\n" * 50
+
+
+class Unseekable(io.RawIOBase):
+    """A pipe-like stream, as some uploads arrive."""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def read(self, size=-1):
+        return self._data.read(size)
+
+
+@pytest.mark.parametrize("data, encoding", [
+    (codecs.BOM_UTF8 + TEXT.encode("utf-8"), "utf-8-sig"),
+    (codecs.BOM_UTF16_LE + TEXT.encode("utf-16-le"), "utf-16"),
+    (codecs.BOM_UTF16_BE + TEXT.encode("utf-16-be"), "utf-16"),
+    (codecs.BOM_UTF32_LE + TEXT.encode("utf-32-le"), "utf-32"),
+    (TEXT.encode("utf-8"), "utf-8"),
+])
+def test_byte_order_marks_and_utf8_are_detected(data, encoding):
+    assert detect_encoding(data[:text_ingestion.DETECTION_PREFIX_BYTES]) == encoding
+    # Small blocks cut multi-byte characters and the BOM across reads; the BOM is not in the text
+    assert "".join(iter_text_blocks(io.BytesIO(data), block_bytes=7)) == TEXT
+
+
+def test_utf8_character_cut_off_by_the_detection_prefix_is_still_utf8():
+    data = ("a" * (text_ingestion.DETECTION_PREFIX_BYTES - 1) + "é").encode("utf-8")
+    assert detect_encoding(data[:text_ingestion.DETECTION_PREFIX_BYTES]) == "utf-8"
+
+
+def test_falls_back_to_cp1252_without_charset_detection(monkeypatch):
+    monkeypatch.setattr(text_ingestion, "charset_detection", False)
+    data = "Café “closed” until Monday.".encode("cp1252")
+    assert detect_encoding(data) == "cp1252"
+    assert read_text(io.BytesIO(data)) == "Café “closed” until Monday."
+
+
+def test_undecodable_bytes_are_replaced():
+    # Valid UTF-8 in the detection prefix, then a byte that is not
+    data = b"a" * text_ingestion.DETECTION_PREFIX_BYTES + b"\xff tail"
+    assert read_text(io.BytesIO(data)).endswith("a� tail")
+
+
+def test_unseekable_streams_are_spooled():
+    data = codecs.BOM_UTF16_LE + TEXT.encode("utf-16-le")
+    assert read_text(Unseekable(data)) == TEXT
+
+
+def test_max_chars_stops_reading():
+    blocks = list(iter_text_blocks(io.BytesIO(TEXT.encode("utf-8")), max_chars=100, block_bytes=64))
+    assert "".join(blocks) == TEXT[:100]
+
+
+def test_oversized_uploads_are_rejected():
+    with pytest.raises(UploadTooLarge):
+        read_text(io.BytesIO(b"x" * 1000), max_bytes=999)
+    with pytest.raises(UploadTooLarge):
+        read_text(Unseekable(b"x" * 1000), max_bytes=999)
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from text_processing import simple_sentence_tokenize, sentence_spans
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("He left. Dr. Smith arrived.", ["He left.", "Dr. Smith arrived."]),
+    ("It rained. Mr. Lee stayed home. Mrs. Lee did not.",
+     ["It rained.", "Mr. Lee stayed home.", "Mrs. Lee did not."]),
+    ("Dr. Rao spoke first. Prof. Iyer followed.", ["Dr. Rao spoke first.", "Prof. Iyer followed."]),
+])
+def test_title_abbreviation_at_sentence_start(text, expected):
+    assert simple_sentence_tokenize(text) == expected
+
+
+def test_initials_do_not_end_a_sentence():
+    assert simple_sentence_tokenize("The report is by J. Smith. It was published today. A. B. Kumar agreed.") == [
+        "The report is by J. Smith.", "It was published today.", "A. B. Kumar agreed."]
+
+
+def test_decimals_do_not_end_a_sentence():
+    assert simple_sentence_tokenize("Rainfall was 12.5 cm. Winds reached 3.2 times the average.") == [
+        "Rainfall was 12.5 cm.", "Winds reached 3.2 times the average."]
+
+
+def test_closing_quotes_stay_with_their_sentence():
+    assert simple_sentence_tokenize('He shouted "Run!" Everyone ran. She asked “Why?” Nobody knew.') == [
+        'He shouted "Run!"', "Everyone ran.", "She asked “Why?”", "Nobody knew."]
+
+
+def test_abbreviations_before_lowercase_and_numbers():
+    assert simple_sentence_tokenize("Bring tools, e.g. a hammer. See No. 5 for details. Done.") == [
+        "Bring tools, e.g. a hammer.", "See No. 5 for details.", "Done."]
+
+
+def test_spans_point_into_the_text():
+    text = "  First one.  Second one?\nThird one!  "
+    assert [text[start:end] for start, end in sentence_spans(text)] == ["First one.", "Second one?", "Third one!"]
+
+
+def test_many_abbreviations_segment_in_linear_time():
+    text = "Word. Dr. " * 40000
+    start = time.perf_counter()
+    sentences = simple_sentence_tokenize(text)
+    assert len(sentences) == 40001
+    assert time.perf_counter() - start < 5
@@ -0,0 +1,89 @@
+import pytest
+
+import translation_service
+from translation_service import (split_for_translation, translate_chunk, translate_text, TranslationError,
+                                 _encoded_length)
+from translation_stub import running_stub
+
+LONG_URL = "https://example.com/reports/" + "cyclone-warning-" * 300
+CJK = "气旋预计明天傍晚在东海岸登陆并带来强降雨" * 150
+
+
+def non_space(text):
+    return "".join(text.split())
+
+
+@pytest.mark.parametrize("text", [
+    " ".join(f"Sentence number {i} about the cyclone warning." for i in range(300)),
+    "One very long sentence " + "with many words " * 400 + "ends here.",
+    f"The full report is at {LONG_URL} for anyone who needs it.",
+    f"Chinese text follows. {CJK} And English again.",
+])
+def test_chunks_fit_the_byte_limit_and_keep_the_text_in_order(text):
+    chunks = split_for_translation(text, max_bytes=500)
+    assert len(chunks) > 1
+    assert max(_encoded_length(chunk) for chunk in chunks) <= 500
+    assert non_space("".join(chunks)) == non_space(text)
+
+
+def test_tokens_are_split_between_characters():
+    chunks = split_for_translation(CJK, max_bytes=100)
+    # Each CJK character is 9 URL-encoded bytes and is never cut
+    assert all(_encoded_length(chunk) <= 100 for chunk in chunks)
+    assert "".join(chunks) == CJK
+
+
+def test_translations_are_reassembled_in_order(monkeypatch):
+    text = " ".join(f"Sentence {i} of the bulletin." for i in range(400)) + f" {CJK} {LONG_URL}"
+    with running_stub(max_url_length=2500) as (url, stub):
+        monkeypatch.setattr(translation_service, "TRANSLATE_URL", url)
+        translated = translate_text(text, "ta", backend="google")
+        assert stub.stats["requests"] > 4
+    assert non_space(translated.replace("[ta]", "")) == non_space(text)
+
+
+class ScriptedSession:
+    """Returns the scripted status codes in turn, answering 200 with a translation."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, params, timeout):
+        self.calls += 1
+        status = self.statuses.pop(0)
+        return ScriptedResponse(status, params["q"])
+
+
+class ScriptedResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return [[[f"[ta]{self.text}", self.text]]]
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(translation_service, "BACKOFF_SECONDS", 0)
+
+
+def test_transient_failures_are_retried(no_backoff):
+    session = ScriptedSession([503, 429, 200])
+    assert translate_chunk("Hello.", session=session, base_url="http://stub") == "[ta]Hello."
+    assert session.calls == 3
+
+
+def test_retries_are_bounded(no_backoff):
+    session = ScriptedSession([503] * (translation_service.MAX_RETRIES + 1))
+    with pytest.raises(TranslationError):
+        translate_chunk("Hello.", session=session, base_url="http://stub")
+    assert session.calls == translation_service.MAX_RETRIES + 1
+
+
+def test_client_errors_are_not_retried(no_backoff):
+    session = ScriptedSession([414, 200])
+    with pytest.raises(TranslationError, match="414"):
+        translate_chunk("Hello.", session=session, base_url="http://stub")
+    assert session.calls == 1
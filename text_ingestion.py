@@ -0,0 +1,138 @@
+import os
+import codecs
+import tempfile
+import importlib.util
+
+# Uploads larger than this are rejected before anything is decoded
+MAX_UPLOAD_BYTES = int(os.environ.get("SUMMARIZER_MAX_UPLOAD_MB", "200")) * 1024 * 1024
+# Bytes decoded at a time; peak memory while streaming is a small multiple of this
+BLOCK_BYTES = int(os.environ.get("SUMMARIZER_BLOCK_KB", "1024")) * 1024
+# Bytes inspected to choose an encoding
+DETECTION_PREFIX_BYTES = 64 * 1024
+# Streams that cannot seek are spooled to memory up to this size, then to a temporary file
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+charset_detection = importlib.util.find_spec("charset_normalizer") is not None
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def detect_encoding(prefix):
+    """
+    Pick an encoding from the first bytes of a file: a byte order mark, then UTF-8,
+    then charset_normalizer's guess if it is installed, and cp1252 as the last resort.
+    """
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        # Not final, so a multi-byte character cut off at the end of the prefix is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if charset_detection:
+        import charset_normalizer
+        match = charset_normalizer.from_bytes(prefix).best()
+        if match is not None:
+            return match.encoding
+    return "cp1252"
+
+
+def _size(file):
+    size = getattr(file, "size", None)
+    if size is not None:
+        return size
+    position = file.tell()
+    size = file.seek(0, os.SEEK_END)
+    file.seek(position)
+    return size
+
+
+class TextStream:
+    """
+    Decodes a binary file object block by block, so the whole text never has to be in
+    memory at once. Bytes that are invalid in the detected encoding become U+FFFD
+    instead of failing the upload.
+    """
+
+    def __init__(self, file, max_bytes=MAX_UPLOAD_BYTES, block_bytes=BLOCK_BYTES):
+        self.block_bytes = block_bytes
+        self._spool = None
+        seekable = getattr(file, "seekable", None)
+        if seekable is None or not seekable():
+            file = self._spool = self._spool_stream(file, max_bytes)
+        self.file = file
+        self.size = _size(file)
+        if self.size > max_bytes:
+            raise UploadTooLarge(f"File is {self.size / 1e6:.1f} MB; the limit is {max_bytes / 1e6:.0f} MB")
+
+        self.file.seek(0)
+        self.encoding = detect_encoding(self.file.read(DETECTION_PREFIX_BYTES))
+
+    def _spool_stream(self, file, max_bytes):
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+        copied = 0
+        while True:
+            chunk = file.read(self.block_bytes)
+            if not chunk:
+                break
+            copied += len(chunk)
+            if copied > max_bytes:
+                spool.close()
+                raise UploadTooLarge(f"File exceeds the limit of {max_bytes / 1e6:.0f} MB")
+            spool.write(chunk)
+        return spool
+
+    def blocks(self, max_chars=None):
+        """Yield decoded text blocks in order, stopping once max_chars characters have been yielded."""
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        self.file.seek(0)
+        produced = 0
+        while max_chars is None or produced < max_chars:
+            chunk = self.file.read(self.block_bytes)
+            text = decoder.decode(chunk, final=not chunk)
+            if max_chars is not None and produced + len(text) > max_chars:
+                text = text[:max_chars - produced]
+            if text:
+                produced += len(text)
+                yield text
+            if not chunk:
+                break
+
+    def read(self, max_chars=None):
+        """The whole text, joined once from the decoded blocks."""
+        return "".join(self.blocks(max_chars))
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_text_blocks(file, max_chars=None, max_bytes=MAX_UPLOAD_BYTES, block_bytes=BLOCK_BYTES):
+    """Decoded text blocks of a binary file object, for stages that can work incrementally."""
+    with TextStream(file, max_bytes, block_bytes) as stream:
+        yield from stream.blocks(max_chars)
+
+
+def read_text(file, max_chars=None, max_bytes=MAX_UPLOAD_BYTES):
+    with TextStream(file, max_bytes) as stream:
+        return stream.read(max_chars)
+
@@ -1,30 +1,139 @@
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import heapq
+from sentence_scoring import score_sentences
+from idf_model import get_idf_model
+from tracing import trace_stage
+
+# Sentence-ending punctuation, optional closing quotes/brackets, then whitespace
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+["\'\u201d\u2019)\]]*\s+')
+NON_SPACE = re.compile(r'\S')
+
+# Abbreviations that come before a name, so a following capital letter does not start a sentence
+TITLE_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "rev", "hon", "gen", "col", "capt", "lt", "sgt",
+}
+# Abbreviations that only end a sentence when followed by a capital letter
+ABBREVIATIONS = {
+    "e.g", "i.e", "etc", "vs", "al", "fig", "figs", "no", "nos", "vol", "approx", "dept", "est", "inc", "ltd",
+    "co", "corp", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec", "p", "pp",
+}
+
+def _is_boundary(text, sentence_start, match):
+    """Decide whether a punctuation match ends a sentence."""
+    if text[match.start()] != "." or text[match.start() + 1] in ".!?":
+        # "!", "?", "..." and mixed runs always end a sentence
+        return True
+
+    next_char = text[match.end()] if match.end() < len(text) else ""
+    if next_char.islower():
+        # "e.g. the", "approx. twenty" - a lowercase continuation is never a new sentence
+        return False
+
+    # rfind scans backwards from the period, so only the last word is examined; a word that
+    # opens the sentence starts at sentence_start, never earlier in the document
+    word_start = max(sentence_start - 1,
+                     text.rfind(' ', sentence_start, match.start()),
+                     text.rfind('\n', sentence_start, match.start()),
+                     text.rfind('\t', sentence_start, match.start())) + 1
+    word = text[word_start:match.start()].lower().lstrip('("\'')
+    if word in TITLE_ABBREVIATIONS:
+        return False
+    if len(word) == 1 and word.isalpha():
+        # Initials such as "J. Smith"
+        return False
+    if word in ABBREVIATIONS or '.' in word:
+        # "No. 5", "U.S. 2020"; the same abbreviation before a capital ends the sentence
+        return not (next_char.isdigit() or not next_char)
+    return True
+
+def iter_sentence_spans(text):
+    """
+    Lazily yield (start, end) offsets of each sentence in text, without copying it.
+    Boundaries are ".", "!" or "?" followed by whitespace, except after common
+    abbreviations, initials and before lowercase continuations.
+    """
+    sentence_start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        if not _is_boundary(text, sentence_start, match):
+            continue
+        span = _strip_span(text, sentence_start, match.end())
+        if span:
+            yield span
+        sentence_start = match.end()
+    span = _strip_span(text, sentence_start, len(text))
+    if span:
+        yield span
+
+def _strip_span(text, start, end):
+    first = NON_SPACE.search(text, start, end)
+    if first is None:
+        return None
+    start = first.start()
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def sentence_spans(text):
+    """List of (start, end) sentence offsets; see iter_sentence_spans."""
+    with trace_stage("sentence_tokenize", len(text)):
+        return list(iter_sentence_spans(text))
 
 def simple_sentence_tokenize(text):
     """
     A simple sentence tokenizer that doesn't rely on NLTK.
-    Uses regex to split text on sentence-ending punctuation followed by spaces.
+    Returns copies of the sentences found by sentence_spans.
     """
-    # Split on period, exclamation mark, or question mark followed by space or newline
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    # Filter out empty sentences
-    return [s.strip() for s in sentences if s.strip()]
+    return [text[start:end] for start, end in sentence_spans(text)]
 
-def get_sentence_scores(sentences):
-    if len(sentences) < 2:
-        return [(0, 1.0)]
-    
-    tfidf = TfidfVectorizer(stop_words="english")
-    tfidf_matrix = tfidf.fit_transform(sentences)
-    cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
-    return [(idx, sum(cosine_sim[idx]) - 1) for idx in range(len(sentences))]
+def chunk_sentences(sentences, token_counts, max_tokens):
+    """
+    Group consecutive sentences into chunks whose total token count stays within max_tokens.
+    A single sentence longer than max_tokens becomes its own chunk.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for sentence, n_tokens in zip(sentences, token_counts):
+        if current and current_tokens + n_tokens > max_tokens:
+            chunks.append(' '.join(current))
+            current = []
+            current_tokens = 0
+        current.append(sentence)
+        current_tokens += n_tokens
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+def get_sentence_scores(sentences, mode="centrality"):
+    """
+    Score sentences by centrality (sum of cosine similarities to every other sentence)
+    or, with mode="textrank", by PageRank over a sparse top-k similarity graph.
+    IDF comes from the corpus model in SUMMARIZER_IDF_MODEL when one is configured.
+    """
+    return score_sentences(sentences, mode, idf_model=get_idf_model())
+
+def get_span_scores(text, spans, mode="centrality"):
+    """
+    get_sentence_scores for sentences given as offsets into text.
+    Sentences are sliced one at a time while the TF-IDF matrix is built, so the
+    document is never duplicated in memory as a list of strings.
+    """
+    return score_sentences((text[start:end] for start, end in spans), mode, n_sentences=len(spans),
+                           idf_model=get_idf_model())
 
 def get_summary(sentences, sentence_scores, top_n=2):
     # Make sure top_n doesn't exceed the number of sentences
     top_n = min(top_n, len(sentences))
     
-    sorted_sentences = sorted(sentence_scores, key=lambda x: x[1], reverse=True)[:top_n]
+    # nlargest keeps a top_n heap instead of sorting every score, and breaks ties the same way
+    sorted_sentences = heapq.nlargest(top_n, sentence_scores, key=lambda x: x[1])
+    sorted_sentences = sorted(sorted_sentences, key=lambda x: x[0])
+    return ' '.join([sentences[idx] for idx, _ in sorted_sentences])
+
+def get_summary_from_spans(text, spans, sentence_scores, top_n=2):
+    """get_summary for sentences given as offsets into text."""
+    top_n = min(top_n, len(spans))
+
+    sorted_sentences = heapq.nlargest(top_n, sentence_scores, key=lambda x: x[1])
     sorted_sentences = sorted(sorted_sentences, key=lambda x: x[0])
-    return ' '.join([sentences[idx] for idx, _ in sorted_sentences])
\ No newline at end of file
+    return ' '.join([text[spans[idx][0]:spans[idx][1]] for idx, _ in sorted_sentences])
\ No newline at end of file
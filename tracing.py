@@ -0,0 +1,181 @@
+import os
+import time
+import bisect
+import threading
+import tracemalloc
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Peak memory per stage needs tracemalloc, which slows Python allocations noticeably,
+# so it is opt-in. Without it only durations and input sizes are recorded.
+TRACE_MEMORY = os.environ.get("SUMMARIZER_TRACE_MEMORY", "0") == "1"
+METRICS_PORT = int(os.environ.get("SUMMARIZER_METRICS_PORT", "0"))
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = tuple(10 ** exponent for exponent in range(2, 10))
+
+_collector = contextvars.ContextVar("span_collector", default=None)
+_depth = contextvars.ContextVar("span_depth", default=0)
+_memory_lock = threading.Lock()
+_memory_users = 0
+_metric_renderers = []
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the shape Prometheus expects."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}  # label value -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        with self._lock:
+            series = self._series.setdefault(label, [0] * (len(self.buckets) + 2))
+            index = bisect.bisect_left(self.buckets, value)
+            # Values above the largest bound only count towards +Inf
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self, label_name):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{self.name}_bucket{{{label_name}="{label}",le="+Inf"}} {series[-2]}')
+                lines.append(f'{self.name}_count{{{label_name}="{label}"}} {series[-2]}')
+                lines.append(f'{self.name}_sum{{{label_name}="{label}"}} {series[-1]}')
+        return lines
+
+
+stage_duration = Histogram("summarizer_stage_duration_seconds", "Time spent in each pipeline stage.",
+                           DURATION_BUCKETS)
+stage_input_size = Histogram("summarizer_stage_input_size", "Input size of each stage (characters or items).",
+                             SIZE_BUCKETS)
+stage_peak_memory = Histogram("summarizer_stage_peak_memory_bytes",
+                              "Peak traced Python memory during each stage (SUMMARIZER_TRACE_MEMORY=1).",
+                              SIZE_BUCKETS)
+
+
+@contextmanager
+def trace_stage(stage, input_size=None):
+    """
+    Time a pipeline stage and record it in the process-wide histograms and in the
+    span list of the enclosing collect_spans() block, if any.
+    Peak memory is attributed per stage only approximately when stages overlap in other threads.
+    """
+    global _memory_users
+    track_memory = TRACE_MEMORY
+    if track_memory:
+        with _memory_lock:
+            if _memory_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _memory_users += 1
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+
+    depth = _depth.get()
+    span = {"stage": stage, "seconds": None, "input_size": input_size, "peak_bytes": None,
+            "depth": depth, "top_level": depth == 0}
+    spans = _collector.get()
+    if spans is not None:
+        # Added on entry so spans are listed in start order, parents before their children
+        spans.append(span)
+    depth_token = _depth.set(depth + 1)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _depth.reset(depth_token)
+        span["seconds"] = seconds
+        if track_memory:
+            with _memory_lock:
+                span["peak_bytes"] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+                _memory_users -= 1
+                if _memory_users == 0:
+                    tracemalloc.stop()
+            stage_peak_memory.observe(stage, span["peak_bytes"])
+
+        stage_duration.observe(stage, seconds)
+        if input_size is not None:
+            stage_input_size.observe(stage, input_size)
+
+
+@contextmanager
+def collect_spans():
+    """
+    Collect the spans recorded in this context, e.g. for one dashboard action.
+    Work handed to thread pools is included when submitted through run_in_context.
+    """
+    spans = []
+    token = _collector.set(spans)
+    depth_token = _depth.set(0)
+    try:
+        yield spans
+    finally:
+        _depth.reset(depth_token)
+        _collector.reset(token)
+
+
+def run_in_context(fn):
+    """Wrap fn so calls made from worker threads record spans into the caller's collector."""
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return wrapper
+
+
+def register_metrics(render):
+    """Add render(), returning exposition lines, to what /metrics serves."""
+    _metric_renderers.append(render)
+
+
+def render_prometheus():
+    """All stage metrics, plus registered ones, in the Prometheus text exposition format."""
+    lines = []
+    for histogram in (stage_duration, stage_input_size, stage_peak_memory):
+        lines.extend(histogram.render("stage"))
+    for render in _metric_renderers:
+        lines.extend(render())
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_metrics_server = None
+_metrics_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """Serve /metrics from a background thread. Only the first call starts a server; port 0 disables it."""
+    global _metrics_server
+    with _metrics_lock:
+        if _metrics_server is None and port:
+            _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _metrics_server.daemon_threads = True
+            threading.Thread(target=_metrics_server.serve_forever, name="metrics", daemon=True).start()
+        return _metrics_server
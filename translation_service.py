@@ -1,40 +1,187 @@
-import streamlit as st
-import requests
+import os
+import time
+import random
+import threading
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from lazy_imports import lazy_import
+from tracing import trace_stage, run_in_context
+from text_processing import simple_sentence_tokenize
+from local_translation import translate_text_local
+from inference_scheduler import SchedulerBusy
 
-def translate_text(text, target_language='ta'):
+requests = lazy_import("requests")
+
+# "google" calls TRANSLATE_URL; "local" runs a seq2seq model on this machine (see local_translation)
+TRANSLATION_BACKEND = os.environ.get("TRANSLATE_BACKEND", "google")
+TRANSLATION_BACKENDS = ("google", "local")
+TRANSLATE_URL = os.environ.get("TRANSLATE_API_URL", "https://translate.googleapis.com/translate_a/single")
+# Longest URL-encoded text sent in one request; keeps the query string under common URL limits
+MAX_CHUNK_QUERY_BYTES = int(os.environ.get("TRANSLATE_MAX_CHUNK_BYTES", "1800"))
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("TRANSLATE_MAX_CONCURRENCY", "4"))
+REQUEST_TIMEOUT = float(os.environ.get("TRANSLATE_TIMEOUT_SECONDS", "10"))
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class TranslationError(Exception):
+    pass
+
+
+def get_session():
+    """Return the shared HTTP session, which keeps connections to the endpoint alive between calls."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_REQUESTS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _encoded_length(text):
+    return len(quote(text, safe=""))
+
+
+def _split_token(token, max_bytes):
+    """Split a token without whitespace (a URL, or CJK text) between characters into pieces that fit max_bytes."""
+    pieces = []
+    start = 0
+    size = 0
+    for end, character in enumerate(token):
+        # A character is never cut, so its UTF-8 bytes always travel together
+        character_bytes = _encoded_length(character)
+        if size and size + character_bytes > max_bytes:
+            pieces.append(token[start:end])
+            start = end
+            size = 0
+        size += character_bytes
+    pieces.append(token[start:])
+    return pieces
+
+
+def split_for_translation(text, max_bytes=MAX_CHUNK_QUERY_BYTES):
     """
-    Translate text to the target language using Google Translate API (no key required).
+    Split text on sentence boundaries into chunks whose URL-encoded size fits max_bytes.
+    Sentences that are too long on their own are split on whitespace, and single tokens
+    that are still too long are split between characters.
+    """
+    chunks = []
+    current = []
+    current_bytes = 0
+    for sentence in simple_sentence_tokenize(text):
+        pieces = [sentence]
+        if _encoded_length(sentence) > max_bytes:
+            pieces = []
+            piece = ""
+            for word in sentence.split():
+                if _encoded_length(word) > max_bytes:
+                    if piece:
+                        pieces.append(piece)
+                    *parts, piece = _split_token(word, max_bytes)
+                    pieces.extend(parts)
+                    continue
+                candidate = f"{piece} {word}" if piece else word
+                if piece and _encoded_length(candidate) > max_bytes:
+                    pieces.append(piece)
+                    candidate = word
+                piece = candidate
+            if piece:
+                pieces.append(piece)
+
+        for piece in pieces:
+            # +3 for the encoded space that joins sentences within a chunk
+            size = _encoded_length(piece) + (3 if current else 0)
+            if current and current_bytes + size > max_bytes:
+                chunks.append(' '.join(current))
+                current = []
+                current_bytes = 0
+                size = _encoded_length(piece)
+            current.append(piece)
+            current_bytes += size
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def translate_chunk(chunk, target_language='ta', session=None, base_url=None):
+    """Translate one chunk, retrying transient failures with exponential backoff."""
+    session = session or get_session()
+    params = {
+        "client": "gtx",
+        "sl": "auto",  # Source language (auto-detect)
+        "tl": target_language,  # Target language
+        "dt": "t",  # Return text
+        "q": chunk
+    }
+    last_error = None
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            # Exponential backoff with jitter so concurrent chunks do not retry in lockstep
+            time.sleep(BACKOFF_SECONDS * (2 ** (attempt - 1)) * (0.5 + random.random()))
+        try:
+            with trace_stage("translate_request", len(chunk)):
+                response = session.get(base_url or TRANSLATE_URL, params=params, timeout=REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            last_error = e
+            continue
+        if response.status_code == 200:
+            # Extract translated text from response
+            result = response.json()
+            return ''.join([sentence[0] for sentence in result[0] if sentence[0]])
+        last_error = TranslationError(f"Translation API error: Status code {response.status_code}")
+        if response.status_code not in RETRY_STATUSES:
+            break
+    raise last_error
+
+
+def translate_chunks(chunks, target_language='ta', max_workers=MAX_CONCURRENT_REQUESTS, base_url=None):
+    """Translate chunks concurrently and return the translations in input order."""
+    if len(chunks) <= 1 or max_workers <= 1:
+        return [translate_chunk(chunk, target_language, base_url=base_url) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        translate = run_in_context(lambda chunk: translate_chunk(chunk, target_language, base_url=base_url))
+        return list(executor.map(translate, chunks))
+
+
+def translate_text(text, target_language='ta', backend=TRANSLATION_BACKEND):
+    """
+    Translate text to the target language using Google Translate API (no key required),
+    or with backend="local", with a local model that needs no network access.
     Default target language is Tamil ('ta').
-    
+    Long text is split on sentence boundaries and the pieces are translated concurrently
+    (Google) or in length-sorted batches (local).
+
     Args:
         text (str): Text to translate
         target_language (str): Target language code (default: 'ta' for Tamil)
-        
+        backend (str): "google" or "local" (default: TRANSLATE_BACKEND)
+
     Returns:
-        str: Translated text or original text if translation fails
+        str: Translated text
+
+    Raises:
+        TranslationError: if the text could not be translated. It is raised rather than
+        reported here because translations run in background jobs and API workers, where
+        nothing would display it; the job fails and the caller shows the error.
     """
+    if backend not in TRANSLATION_BACKENDS:
+        raise ValueError(f"Unknown translation backend {backend!r}; choose from {', '.join(TRANSLATION_BACKENDS)}")
     try:
-        # Using a simple approach that works without authentication
-        base_url = "https://translate.googleapis.com/translate_a/single"
-        params = {
-            "client": "gtx",
-            "sl": "auto",  # Source language (auto-detect)
-            "tl": target_language,  # Target language
-            "dt": "t",  # Return text
-            "q": text
-        }
-        
-        response = requests.get(base_url, params=params)
-        
-        if response.status_code == 200:
-            # Extract translated text from response
-            result = response.json()
-            translated_text = ''.join([sentence[0] for sentence in result[0]])
-            return translated_text
-        else:
-            st.error(f"Translation API error: Status code {response.status_code}")
+        if backend == "local":
+            return translate_text_local(text, target_language)
+        chunks = split_for_translation(text)
+        if not chunks:
             return text
-    
+        with trace_stage("translate", len(text)):
+            return ' '.join(translate_chunks(chunks, target_language))
+
+    except (TranslationError, SchedulerBusy):
+        raise
     except Exception as e:
-        st.error(f"Translation error: {str(e)}")
-        return text  # Return original text if translation fails
\ No newline at end of file
+        raise TranslationError(f"Translation error: {e}") from e
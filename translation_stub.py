@@ -0,0 +1,102 @@
+"""
+Local stand-in for the Google translate endpoint, for offline testing and benchmarking.
+
+    python translation_stub.py --port 8765 --latency-ms 50 --fail-rate 0.1
+    TRANSLATE_API_URL=http://127.0.0.1:8765/translate_a/single streamlit run app.py
+
+The "translation" is the input wrapped in [target_language], returned in the same
+JSON shape as the real endpoint. Requests with a longer URL than max_url_length get 414.
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from text_processing import simple_sentence_tokenize
+
+
+def fake_translate(text, target_language):
+    return ' '.join(f"[{target_language}]{sentence}" for sentence in simple_sentence_tokenize(text))
+
+
+class StubTranslateHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.stats_lock:
+            server.stats["requests"] += 1
+        if len(self.path) > server.max_url_length:
+            self._send(414, {"error": "URI too long"})
+            return
+        if server.latency:
+            time.sleep(server.latency)
+        if random.random() < server.fail_rate:
+            with server.stats_lock:
+                server.stats["failures"] += 1
+            self._send(503, {"error": "injected failure"})
+            return
+
+        query = parse_qs(urlparse(self.path).query)
+        text = query.get("q", [""])[0]
+        target_language = query.get("tl", ["ta"])[0]
+        translated = fake_translate(text, target_language)
+        self._send(200, [[[translated, text, None, None, 1]], None, "en"])
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_stub_server(host="127.0.0.1", port=0, latency=0.0, fail_rate=0.0, max_url_length=8192):
+    server = ThreadingHTTPServer((host, port), StubTranslateHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.max_url_length = max_url_length
+    server.stats = {"requests": 0, "failures": 0}
+    server.stats_lock = threading.Lock()
+    return server
+
+
+@contextmanager
+def running_stub(latency=0.0, fail_rate=0.0, max_url_length=8192):
+    """Run the stub on a free port in a background thread and yield its base URL and server."""
+    server = make_stub_server(latency=latency, fail_rate=fail_rate, max_url_length=max_url_length)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}/translate_a/single", server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stub of the Google translate endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--max-url-length", type=int, default=8192)
+    args = parser.parse_args(argv)
+
+    server = make_stub_server(args.host, args.port, args.latency_ms / 1000, args.fail_rate, args.max_url_length)
+    print(f"Stub translate endpoint on http://{args.host}:{args.port}/translate_a/single")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()